@@ -0,0 +1,79 @@
+"""Run the benchmark suite against a local stand-in server.
+
+    python -m benchmarks                     # compare with benchmarks/baseline.json
+    python -m benchmarks --update-baseline   # record new baselines
+    python -m benchmarks parse               # only benchmarks whose name contains "parse"
+
+Exits with status 1 if any benchmark is more than ``--tolerance``
+worse than its baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+
+from benchmarks.server import BenchmarkServer
+from benchmarks.suite import benchmarks
+
+
+baseline_path = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("filter", nargs="?", default="")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    regressions = []
+    with BenchmarkServer() as server:
+        for name, (function, unit, lower_is_better) in benchmarks.items():
+            if args.filter not in name:
+                continue
+
+            value = function(server.url)
+            results[name] = value
+
+            line = f"{name:<48} {value:>10.2f} {unit:<6}"
+            if name in baseline:
+                change = (value - baseline[name]) / baseline[name]
+                worse = (
+                    change > args.tolerance
+                    if lower_is_better
+                    else -change > args.tolerance
+                )
+                line += f" {change:>+7.1%} vs baseline"
+                if worse:
+                    line += "  REGRESSION"
+                    regressions.append(name)
+            print(line, flush=True)
+
+    if args.update_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(
+                {
+                    "machine": f"{platform.system()} {platform.machine()}",
+                    "python": platform.python_version(),
+                    "results": {**baseline, **results},
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+            f.write("\n")
+        return 0
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Compare the columnar parser with the previous ``pd.read_json`` approach.
+
+Run with ``python -m benchmarks.parsing``.
+"""
+
+import time
+
+import pandas as pd
+from benchmarks.payloads import synthetic_response
+
+from blueskyapi import parsing
+
+
+def read_json(response: str) -> pd.DataFrame:
+    df = pd.read_json(response)
+    df.forecast_moment = pd.to_datetime(df.forecast_moment)
+    return df
+
+
+def best_of(function, argument, repeat: int = 5) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    print(f"{'rows':>8} {'read_json':>12} {'columnar':>12} {'speedup':>8}")
+    for rows in [150, 1_500, 15_000, 150_000]:
+        response = synthetic_response(rows)
+        before = best_of(read_json, response)
+        after = best_of(parsing.create_dataframe, response)
+        print(
+            f"{rows:>8} {before * 1000:>10.1f}ms {after * 1000:>10.1f}ms"
+            f" {before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
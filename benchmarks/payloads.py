@@ -0,0 +1,42 @@
+import json
+import random
+from datetime import datetime
+from datetime import timedelta
+from typing import List
+from typing import Optional
+
+
+forecast_distances = [0, 3, 6, 9, 12, 15, 18, 21, 24, 48, 72, 96, 120, 144, 168]
+run_interval = timedelta(hours=6)
+
+
+def synthetic_records(
+    forecast_moments: List[datetime], columns: int = 33, seed: Optional[int] = 0
+) -> List[dict]:
+    """Forecast records shaped like the API's, with random values."""
+    rng = random.Random(seed)
+    return [
+        {
+            "forecast_moment": moment.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "forecast_distance": distance,
+            **{
+                f"variable_{c}": round(rng.uniform(-50, 300), 2) for c in range(columns)
+            },
+        }
+        for moment in forecast_moments
+        for distance in forecast_distances
+    ]
+
+
+def forecast_moments(start: datetime, end: datetime) -> List[datetime]:
+    """All forecast runs between ``start`` and ``end``, inclusive."""
+    first = start + (datetime.min - start) % run_interval
+    count = max(0, (end - first) // run_interval + 1)
+    return [first + i * run_interval for i in range(count)]
+
+
+def synthetic_response(rows: int, columns: int = 33) -> str:
+    """A JSON response with about ``rows`` records."""
+    runs = max(1, rows // len(forecast_distances))
+    moments = [datetime(2021, 1, 1) + i * run_interval for i in range(runs)]
+    return json.dumps(synthetic_records(moments, columns))
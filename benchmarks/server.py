@@ -0,0 +1,76 @@
+"""A local stand-in for the API serving synthetic forecasts.
+
+``/forecasts/latest`` returns one forecast run, ``/forecasts/history``
+one run per six hours between ``min_forecast_moment`` and
+``max_forecast_moment``, so the payload size follows the requested
+range like it does for the real API. Responses are Arrow IPC streams
+when the client asks for them (and ``pyarrow`` is installed), JSON
+otherwise, and gzipped when the client accepts it.
+"""
+
+from datetime import datetime
+from functools import lru_cache
+
+import pandas as pd
+from benchmarks.payloads import forecast_moments
+from benchmarks.payloads import synthetic_records
+
+from blueskyapi.client import _media_types
+from blueskyapi.replay import Exchange
+from blueskyapi.replay import Recording
+from blueskyapi.replay import ReplayServer
+
+
+@lru_cache(maxsize=64)
+def _history(min_moment: str, max_moment: str, format: str) -> Exchange:
+    start = _naive_utc(min_moment)
+    end = _naive_utc(max_moment)
+    return Exchange.from_records(
+        synthetic_records(forecast_moments(start, end)), format
+    )
+
+
+@lru_cache(maxsize=2)
+def _latest(format: str) -> Exchange:
+    return Exchange.from_records(
+        synthetic_records([datetime(2021, 12, 27, 18)]), format
+    )
+
+
+def _naive_utc(value: str) -> datetime:
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp.to_pydatetime()
+
+
+def _supports_arrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class BenchmarkServer(ReplayServer):
+    """Serve synthetic forecasts on a random local port in a background thread.
+
+    Use as a context manager; ``url`` is the base URL to pass to the client.
+    """
+
+    def __init__(self):
+        super().__init__(Recording())
+
+    def respond(self, endpoint, params, headers):
+        query = dict(params)
+        arrow = _media_types["arrow"] in headers.get("Accept", "") and _supports_arrow()
+        format = "arrow" if arrow else "json"
+        if endpoint == "/forecasts/latest":
+            return _latest(format)
+        if endpoint == "/forecasts/history":
+            return _history(
+                query.get("min_forecast_moment", "2021-12-27T00:00:00"),
+                query.get("max_forecast_moment", "2021-12-28T00:00:00"),
+                format,
+            )
+        return None
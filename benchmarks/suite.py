@@ -0,0 +1,177 @@
+import asyncio
+import statistics
+import time
+import tracemalloc
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from benchmarks.parsing import best_of
+from benchmarks.payloads import synthetic_response
+
+import blueskyapi
+from blueskyapi import parsing
+from blueskyapi.processes import ProcessParser
+
+
+# name -> (function(base_url) -> value, unit, whether lower values are better)
+Benchmark = Callable[[str], float]
+benchmarks: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, unit: str, lower_is_better: bool = True):
+    def register(function: Benchmark) -> Benchmark:
+        benchmarks[name] = (function, unit, lower_is_better)
+        return function
+
+    return register
+
+
+def _timings(function: Callable[[], object], repeat: int) -> List[float]:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _points(count: int) -> List[tuple]:
+    return [(40 + i * 0.25, 10.0) for i in range(count)]
+
+
+@benchmark("latest_forecast.latency_p50", "ms")
+def latest_forecast_latency_p50(base_url: str) -> float:
+    client = blueskyapi.Client(base_url=base_url)
+    durations = _timings(lambda: client.latest_forecast(53.5, 13.5), repeat=200)
+    return statistics.median(durations) * 1000
+
+
+@benchmark("latest_forecast.latency_p95", "ms")
+def latest_forecast_latency_p95(base_url: str) -> float:
+    client = blueskyapi.Client(base_url=base_url)
+    durations = sorted(_timings(lambda: client.latest_forecast(53.5, 13.5), 200))
+    return durations[int(len(durations) * 0.95)] * 1000
+
+
+@benchmark("latest_forecast.prepared_latency_p50", "ms")
+def latest_forecast_prepared_latency_p50(base_url: str) -> float:
+    query = blueskyapi.Client(base_url=base_url).prepare_latest()
+    durations = _timings(lambda: query(53.5, 13.5), repeat=200)
+    return statistics.median(durations) * 1000
+
+
+def _history(days: int, format: str = "json") -> Callable[[str], float]:
+    def run(base_url: str) -> float:
+        client = blueskyapi.Client(base_url=base_url)
+        durations = _timings(
+            lambda: client.forecast_history(
+                53.5,
+                13.5,
+                min_forecast_moment="2021-01-01T00:00:00",
+                max_forecast_moment=f"2021-01-{days:02}T00:00:00",
+                format=format,
+            ),
+            repeat=5,
+        )
+        return min(durations) * 1000
+
+    return run
+
+
+benchmark("forecast_history.latency_1_day", "ms")(_history(1))
+benchmark("forecast_history.latency_30_days", "ms")(_history(31))
+benchmark("forecast_history.latency_30_days_arrow", "ms")(_history(31, "arrow"))
+
+
+@benchmark("forecast_history.peak_memory_30_days", "MB")
+def forecast_history_peak_memory(base_url: str) -> float:
+    client = blueskyapi.Client(base_url=base_url)
+
+    def fetch():
+        client.forecast_history(
+            53.5,
+            13.5,
+            min_forecast_moment="2021-01-01T00:00:00",
+            max_forecast_moment="2021-01-31T00:00:00",
+        )
+
+    fetch()  # warm up connections, imports and caches
+    tracemalloc.start()
+    try:
+        fetch()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def _many_throughput(max_workers: int) -> Callable[[str], float]:
+    def run(base_url: str) -> float:
+        client = blueskyapi.Client(base_url=base_url)
+        points = _points(500)
+        [duration] = _timings(
+            lambda: client.latest_forecast_many(points, max_workers=max_workers), 1
+        )
+        return len(points) / duration
+
+    return run
+
+
+benchmark("latest_forecast_many.throughput_1_worker", "req/s", False)(
+    _many_throughput(1)
+)
+benchmark("latest_forecast_many.throughput_10_workers", "req/s", False)(
+    _many_throughput(10)
+)
+
+
+@benchmark("async_client.gather_throughput", "req/s", lower_is_better=False)
+def async_gather_throughput(base_url: str) -> float:
+    points = _points(500)
+
+    async def main():
+        async with blueskyapi.AsyncClient(base_url=base_url) as client:
+            await client.gather(client.latest_forecast(lat, lon) for lat, lon in points)
+
+    [duration] = _timings(lambda: asyncio.run(main()), 1)
+    return len(points) / duration
+
+
+def _history_many(points: int, process_parser: bool) -> Callable[[str], float]:
+    def run(base_url: str) -> float:
+        parser = ProcessParser() if process_parser else None
+        client = blueskyapi.Client(base_url=base_url, process_parser=parser)
+        try:
+            durations = _timings(
+                lambda: client.forecast_history_many(
+                    _points(points),
+                    min_forecast_moment="2021-01-01T00:00:00",
+                    max_forecast_moment="2021-03-01T00:00:00",
+                ),
+                repeat=3,
+            )
+        finally:
+            if parser is not None:
+                parser.close()
+        return min(durations) * 1000
+
+    return run
+
+
+# Enough points for several batches, so the processes path can use every core.
+benchmark("forecast_history_many.latency_32_points", "ms")(_history_many(32, False))
+benchmark("forecast_history_many.latency_32_points_processes", "ms")(
+    _history_many(32, True)
+)
+
+
+def _parse(rows: int) -> Callable[[str], float]:
+    def run(base_url: str) -> float:
+        return best_of(parsing.create_dataframe, synthetic_response(rows)) * 1000
+
+    return run
+
+
+benchmark("parse.1_500_rows", "ms")(_parse(1_500))
+benchmark("parse.15_000_rows", "ms")(_parse(15_000))
+benchmark("parse.150_000_rows", "ms")(_parse(150_000))
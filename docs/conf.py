@@ -29,10 +29,12 @@ version = ""
 release = "0.1.0"
 
 
+from blueskyapi import AsyncClient
 from blueskyapi import Client
 
 
 Client.__module__ = "blueskyapi"
+AsyncClient.__module__ = "blueskyapi"
 
 # -- General configuration ---------------------------------------------------
 
@@ -53,6 +55,8 @@ extensions = [
 ]
 
 typehints_fully_qualified = True
+# pandas is only imported for type checking, see blueskyapi.client.
+set_type_checking_flag = True
 
 # Add any paths that contain templates here, relative to this directory.
 templates_path = ["_templates"]
@@ -1,2 +1,3 @@
 from .__version__ import __version__
+from .async_client import AsyncClient
 from .client import Client
@@ -0,0 +1,259 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timedelta
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from blueskyapi.cache import Cache
+from blueskyapi.cache import DataFrameCache
+from blueskyapi.client import Client
+from blueskyapi.instrumentation import Observer
+from blueskyapi.ratelimit import ConcurrencyLimiter
+from blueskyapi.ratelimit import RateLimiter
+
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class AsyncClient:
+    """Asynchronous client to interact with the blueskyapi.io API.
+
+    Offers the same methods as :class:`Client`, but as coroutines. Up
+    to ``max_concurrency`` requests run at the same time, sharing one
+    pool of keep-alive connections. Use :meth:`gather` to fetch many
+    locations concurrently::
+
+        async with blueskyapi.AsyncClient(max_concurrency=20) as client:
+            forecasts = await client.gather(
+                client.latest_forecast(lat, lon) for lat, lon in points
+            )
+
+    :param api_key: Your API key (create one `here <https://blueskyapi.io/api-keys>`_).
+    :param base_url: Only for testing purposes. Don't use this parameter.
+    :param max_concurrency: Maximum number of requests in flight at the same time.
+    :param cache: Where to cache responses (see :mod:`blueskyapi.cache`), ``None`` to disable caching.
+    :param dataframe_cache: Where to keep parsed results in memory, ``None`` to disable it.
+    :param rate_limiter: How to throttle and retry requests (see :mod:`blueskyapi.ratelimit`), ``None`` to send them right away and raise errors immediately.
+    :param observers: Objects notified about every request and parsed response (see :mod:`blueskyapi.instrumentation`).
+    :param grid_resolution: Spacing in degrees to snap coordinates to (see :class:`Client`).
+    :param keep_alive: Reuse connections between requests.
+    :param timeout: Seconds to wait for the server, either one value or a ``(connect, read)`` pair, ``None`` to wait forever.
+    :param concurrency_limiter: How many of the ``max_concurrency`` requests to have in flight at once, adapted to the API's responses (see :class:`blueskyapi.ratelimit.ConcurrencyLimiter`).
+    :param revalidation_bytes: Memory for latest forecasts kept to send conditional requests for (see :class:`Client`), ``None`` or ``0`` to keep nothing.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 10,
+        cache: Optional[Cache] = None,
+        dataframe_cache: Optional[DataFrameCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        observers: Iterable[Observer] = (),
+        grid_resolution: Optional[float] = None,
+        keep_alive: bool = True,
+        timeout: Union[float, Tuple[float, float], None] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        revalidation_bytes: Optional[int] = 2**26,
+    ):
+        if max_concurrency < 1:
+            raise ValueError(
+                f"max_concurrency should be at least 1, got {max_concurrency}"
+            )
+
+        self.client = Client(
+            api_key,
+            base_url,
+            cache=cache,
+            dataframe_cache=dataframe_cache,
+            rate_limiter=rate_limiter,
+            observers=observers,
+            grid_resolution=grid_resolution,
+            pool_maxsize=max_concurrency,
+            keep_alive=keep_alive,
+            timeout=timeout,
+            concurrency_limiter=concurrency_limiter,
+            revalidation_bytes=revalidation_bytes,
+        )
+        self.max_concurrency = max_concurrency
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="blueskyapi"
+        )
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self.client.api_key
+
+    @property
+    def base_url(self) -> str:
+        return self.client.base_url
+
+    async def latest_forecast(
+        self,
+        lat: float,
+        lon: float,
+        forecast_distances: Iterable[int] = None,
+        columns: Iterable[str] = None,
+        dataset: Optional[str] = None,
+        compact: bool = False,
+        format: str = "json",
+        raw: bool = False,
+    ) -> Union["pd.DataFrame", List[Dict[str, Any]]]:
+        """Obtain the latest forecast.
+
+        See :meth:`Client.latest_forecast` for the parameters.
+        """
+        return await self._run(
+            self.client.latest_forecast,
+            lat,
+            lon,
+            forecast_distances=forecast_distances,
+            columns=columns,
+            dataset=dataset,
+            compact=compact,
+            format=format,
+            raw=raw,
+        )
+
+    async def latest_forecast_moment(
+        self, lat: float, lon: float, dataset: Optional[str] = None
+    ) -> "pd.Timestamp":
+        """Obtain the ``forecast_moment`` of the latest forecast run.
+
+        See :meth:`Client.latest_forecast_moment` for the parameters.
+        """
+        return await self._run(
+            self.client.latest_forecast_moment, lat, lon, dataset=dataset
+        )
+
+    async def has_new_forecast(
+        self,
+        lat: float,
+        lon: float,
+        since: Optional[Union[datetime, str]],
+        dataset: Optional[str] = None,
+    ) -> bool:
+        """Check whether a forecast run newer than ``since`` is available.
+
+        See :meth:`Client.has_new_forecast` for the parameters.
+        """
+        return await self._run(
+            self.client.has_new_forecast, lat, lon, since, dataset=dataset
+        )
+
+    async def forecast_history(
+        self,
+        lat: float,
+        lon: float,
+        min_forecast_moment: Optional[Union[datetime, str]] = None,
+        max_forecast_moment: Optional[Union[datetime, str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+        columns: Optional[Iterable[str]] = None,
+        dataset: Optional[str] = None,
+        compact: bool = False,
+        format: str = "json",
+        chunk_size: Optional[timedelta] = None,
+        max_workers: int = 4,
+        chunk_retries: int = 2,
+    ) -> "pd.DataFrame":
+        """Obtain historical forecasts.
+
+        See :meth:`Client.forecast_history` for the parameters.
+        """
+        return await self._run(
+            self.client.forecast_history,
+            lat,
+            lon,
+            min_forecast_moment=min_forecast_moment,
+            max_forecast_moment=max_forecast_moment,
+            forecast_distances=forecast_distances,
+            columns=columns,
+            dataset=dataset,
+            compact=compact,
+            format=format,
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+            chunk_retries=chunk_retries,
+        )
+
+    async def iter_forecast_history(
+        self,
+        lat: float,
+        lon: float,
+        min_forecast_moment: Union[datetime, str],
+        max_forecast_moment: Optional[Union[datetime, str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+        columns: Optional[Iterable[str]] = None,
+        dataset: Optional[str] = None,
+        compact: bool = False,
+        format: str = "json",
+        chunk_size: timedelta = timedelta(days=7),
+        chunk_retries: int = 2,
+    ) -> AsyncIterator["pd.DataFrame"]:
+        """Obtain historical forecasts chunk by chunk.
+
+        See :meth:`Client.iter_forecast_history` for the parameters.
+        """
+        chunks = self.client.iter_forecast_history(
+            lat,
+            lon,
+            min_forecast_moment=min_forecast_moment,
+            max_forecast_moment=max_forecast_moment,
+            forecast_distances=forecast_distances,
+            columns=columns,
+            dataset=dataset,
+            compact=compact,
+            format=format,
+            chunk_size=chunk_size,
+            chunk_retries=chunk_retries,
+        )
+        while True:
+            chunk = await self._run(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    async def gather(
+        self,
+        calls: Iterable[Awaitable["pd.DataFrame"]],
+        return_exceptions: bool = False,
+    ) -> List[Union["pd.DataFrame", BaseException]]:
+        """Run many calls concurrently and return their results in order.
+
+        At most ``max_concurrency`` of them talk to the API at the
+        same time, the rest wait for a free slot.
+
+        :param calls: Coroutines obtained from this client, e.g. ``client.latest_forecast(lat, lon)``.
+        :param return_exceptions: Return errors in place of the results instead of raising the first one.
+        """
+        return await asyncio.gather(*calls, return_exceptions=return_exceptions)
+
+    def close(self) -> None:
+        """Release the worker threads and pooled connections."""
+        self._executor.shutdown(wait=True)
+        self.client.close()
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(method, *args, **kwargs)
+        )
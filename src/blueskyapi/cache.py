@@ -0,0 +1,213 @@
+"""
+Responses can be cached locally to avoid fetching the same data
+repeatedly, e.g. when several processes ask for the latest forecast of
+the same location within one forecast run::
+
+    import blueskyapi
+    from blueskyapi.cache import SQLiteCache
+
+    client = blueskyapi.Client(cache=SQLiteCache("blueskyapi-cache.sqlite"))
+
+Responses expire after ``ttl`` seconds. Historical forecasts whose
+``max_forecast_moment`` lies far enough in the past can't change anymore
+and are kept until they are evicted.
+
+On top of that, the parsed DataFrames can be kept in memory, which also
+saves the time needed to parse the responses::
+
+    from blueskyapi.cache import DataFrameCache
+
+    client = blueskyapi.Client(dataframe_cache=DataFrameCache(max_bytes=100_000_000))
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+from typing import Optional
+from typing import Union
+
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+Response = Union[str, bytes]
+
+
+class Cache:
+    """Base class for response caches.
+
+    Subclasses implement :meth:`get`, :meth:`set` and :meth:`clear`
+    to store responses in any backend.
+
+    :param ttl: Seconds after which responses expire.
+    """
+
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Response]:
+        """Return the response stored for ``key``, or ``None`` if there is none or it expired."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Response, ttl: Optional[float]) -> None:
+        """Store a response for ``key``.
+
+        :param ttl: Seconds after which the response expires, ``None`` to keep it until evicted.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove all stored responses."""
+        raise NotImplementedError
+
+
+class SQLiteCache(Cache):
+    """Cache responses in a SQLite database file.
+
+    The file can be shared between processes. Once more than
+    ``max_entries`` responses are stored, the least recently used ones
+    are evicted.
+
+    :param path: Path of the database file, created if it doesn't exist.
+    :param ttl: Seconds after which responses expire.
+    :param max_entries: Maximum number of responses to keep.
+    """
+
+    def __init__(self, path: str, ttl: float = 3600, max_entries: int = 10000):
+        super().__init__(ttl)
+        self.path = path
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL"
+            ")"
+        )
+
+    def get(self, key: str) -> Optional[Response]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM responses"
+                " WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return row[0]
+
+    def set(self, key: str, value: Response, ttl: Optional[float]) -> None:
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            self._evict(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _evict(self, now: float) -> None:
+        self._connection.execute(
+            "DELETE FROM responses WHERE expires_at <= ?",
+            (now,),
+        )
+        self._connection.execute(
+            "DELETE FROM responses WHERE key NOT IN"
+            " (SELECT key FROM responses ORDER BY accessed_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+
+class DataFrameCache:
+    """Keep parsed DataFrames in memory.
+
+    Every lookup returns a copy, so callers are free to modify the
+    result. Once more than ``max_entries`` DataFrames or more than
+    ``max_bytes`` bytes are stored, the least recently used ones are
+    evicted.
+
+    :param ttl: Seconds after which DataFrames expire.
+    :param max_entries: Maximum number of DataFrames to keep.
+    :param max_bytes: Maximum total memory usage of the kept DataFrames.
+    """
+
+    def __init__(
+        self, ttl: float = 3600, max_entries: int = 128, max_bytes: int = 2**28
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional["pd.DataFrame"]:
+        """Return a copy of the DataFrame stored for ``key``, or ``None`` if there is none or it expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            df, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return df.copy()
+
+    def set(self, key: str, value: "pd.DataFrame", ttl: Optional[float]) -> None:
+        """Store a copy of a DataFrame for ``key``.
+
+        :param ttl: Seconds after which the DataFrame expires, ``None`` to keep it until evicted.
+        """
+        nbytes = int(value.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+
+        expires_at = None if ttl is None else time.time() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value.copy(), expires_at, nbytes)
+            self.nbytes += nbytes
+
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Remove all stored DataFrames."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, _, nbytes = self._entries.pop(key)
+        self.nbytes -= nbytes
@@ -1,21 +1,104 @@
+import importlib.util
+import json
 import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
 from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Dict
 from typing import Iterable
+from typing import Iterator
+from typing import List
 from typing import Optional
+from typing import Tuple
+from typing import TypeVar
 from typing import Union
+from urllib.parse import urlencode
 
-import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 
 from blueskyapi import default_config
 from blueskyapi import errors
 from blueskyapi.__version__ import __version__
+from blueskyapi.__version__ import importlib_metadata
+from blueskyapi.cache import Cache
+from blueskyapi.cache import DataFrameCache
+from blueskyapi.instrumentation import Observer
+from blueskyapi.instrumentation import ParseEvent
+from blueskyapi.instrumentation import RequestEvent
+from blueskyapi.ratelimit import ConcurrencyLimiter
+from blueskyapi.ratelimit import RateLimiter
+from blueskyapi.ratelimit import _retry_delay
 
 
-def _create_dataframe(response: bytes) -> pd.DataFrame:
-    df = pd.read_json(response)
-    df.forecast_moment = pd.to_datetime(df.forecast_moment)
-    return df
+# pandas takes a while to import, so it's only imported once a DataFrame is built.
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from blueskyapi.processes import ProcessParser
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover
+    _loads = json.loads
+
+# Only latest forecasts are polled, so only they are sent as conditional requests.
+_revalidated_endpoint = "/forecasts/latest"
+
+# Forecast runs older than this won't be updated anymore.
+_history_settles_after = timedelta(days=1)
+
+_media_types = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _prepare_points(
+    value: Iterable[Tuple[float, float]], name: str
+) -> List[Tuple[float, float]]:
+    try:
+        return [(lat, lon) for lat, lon in value]
+    except (TypeError, ValueError):
+        raise TypeError(f"{name} should be an array of (lat, lon) pairs, got {value}")
+
+
+def _snap(value: float, resolution: Optional[float]) -> float:
+    if resolution is None:
+        return value
+    # Rounding again drops floating point noise like 53.50000000000001.
+    return round(round(value / resolution) * resolution, 10)
+
+
+def _fan_out(
+    df: "pd.DataFrame",
+    cells: List[Tuple[float, float]],
+    points: List[Tuple[float, float]],
+) -> "pd.DataFrame":
+    """Repeat the rows fetched for each grid cell for the points inside it."""
+    import numpy as np
+
+    rows = df.groupby(["lat", "lon"], sort=False).indices
+    no_rows = np.array([], dtype=np.intp)
+    positions = [rows.get(cell, no_rows) for cell in cells]
+    counts = [len(p) for p in positions]
+
+    result = df.take(np.concatenate(positions)).reset_index(drop=True)
+    result["lat"] = np.repeat(np.array([lat for lat, _ in points], dtype=float), counts)
+    result["lon"] = np.repeat(np.array([lon for _, lon in points], dtype=float), counts)
+    return result
 
 
 def _prepare_comma_separated_list(
@@ -45,6 +128,212 @@ def _prepare_datetime(value: Union[datetime, str, None], name: str) -> Optional[
         )
 
 
+def _prepare_format(value: str) -> Optional[str]:
+    if value != "json" and value not in _media_types:
+        raise ValueError(
+            f"format should be one of json, {', '.join(_media_types)}, got {value}"
+        )
+    # Binary responses can only be decoded with pyarrow, otherwise stick to JSON.
+    if value == "json" or importlib.util.find_spec("pyarrow") is None:
+        return None
+    return f"{_media_types[value]}, application/json;q=0.5"
+
+
+def _to_utc_timestamp(value: Union[datetime, str]) -> "pd.Timestamp":
+    import pandas as pd
+
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
+def _split_time_range(
+    start: "pd.Timestamp", end: "pd.Timestamp", size: timedelta
+) -> List[Tuple["pd.Timestamp", "pd.Timestamp"]]:
+    if size <= timedelta(0):
+        raise ValueError(f"chunk_size should be positive, got {size}")
+
+    windows = []
+    while start <= end:
+        stop = start + size
+        windows.append((start, min(stop - timedelta(seconds=1), end)))
+        start = stop
+    return windows
+
+
+def _accept_encoding() -> str:
+    encodings = ["gzip", "deflate"]
+    # urllib3 decodes brotli responses when one of these is installed.
+    if any(importlib.util.find_spec(m) for m in ("brotli", "brotlicffi")):
+        encodings.append("br")
+    return ", ".join(encodings)
+
+
+def _cache_key(url: str, params: dict, accept: Optional[str] = None) -> str:
+    key = (
+        url
+        + "?"
+        + urlencode(sorted((k, v) for k, v in params.items() if v is not None))
+    )
+    if accept is not None:
+        key += f"#accept={accept}"
+    return key
+
+
+def _history_settled_before() -> "pd.Timestamp":
+    """Forecast runs before this moment won't be updated anymore."""
+    import pandas as pd
+
+    return pd.Timestamp.now("UTC") - _history_settles_after
+
+
+def _is_immutable(endpoint: str, params: dict) -> bool:
+    max_forecast_moment = params.get("max_forecast_moment")
+    if endpoint != "/forecasts/history" or max_forecast_moment is None:
+        return False
+    return _to_utc_timestamp(max_forecast_moment) < _history_settled_before()
+
+
+T = TypeVar("T")
+
+
+class _SingleFlight:
+    """Share the result of a call with everyone asking for the same key meanwhile."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, function: Callable[[], T]) -> Tuple[T, bool]:
+        """Call ``function`` or wait for the call in flight for ``key``.
+
+        Returns the result and whether it came from another caller.
+        Errors are raised for everyone waiting.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = function()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class _RequestTemplate:
+    """A GET request prepared once and then sent with different query strings.
+
+    Preparing a request and merging the environment's proxy settings
+    takes ``requests`` a lot longer than sending it to a nearby server.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        url: str,
+        accept: Optional[str],
+        timeout: Union[float, Tuple[float, float], None],
+    ):
+        headers = None if accept is None else {"Accept": accept}
+        self.session = session
+        self.url = url
+        self.request = session.prepare_request(
+            requests.Request("GET", url, headers=headers)
+        )
+        self.settings = session.merge_environment_settings(url, {}, None, None, None)
+        self.settings["timeout"] = timeout
+
+    def send(self, params: dict, headers: Dict[str, str]) -> requests.Response:
+        request = self.request.copy()
+        request.headers.update(headers)
+        query = urlencode([(k, v) for k, v in params.items() if v is not None])
+        request.url = f"{self.url}?{query}"
+        return self.session.send(request, **self.settings)
+
+
+@dataclass
+class _Validated:
+    """A response with the validators to revalidate it and the DataFrames parsed from it."""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    response: bytes
+    dataframes: Dict[bool, "pd.DataFrame"] = field(default_factory=dict)
+    nbytes: int = 0
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> Optional["_Validated"]:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            return None
+        return cls(etag, last_modified, response.content, nbytes=len(response.content))
+
+    def conditions(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class _ValidatedResponses:
+    """The latest validated response per query, dropping the least recently used beyond ``max_bytes``."""
+
+    def __init__(self, max_bytes: int = 2**26):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Validated]" = OrderedDict()
+        self._nbytes = 0
+
+    def get(self, key: str) -> Optional[_Validated]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: _Validated) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+            self._entries[key] = entry
+            self._nbytes += entry.nbytes
+            self._evict()
+
+    def add_dataframe(
+        self, key: str, entry: _Validated, compact: bool, df: "pd.DataFrame"
+    ) -> None:
+        with self._lock:
+            if self._entries.get(key) is not entry or compact in entry.dataframes:
+                return
+            entry.dataframes[compact] = df
+            nbytes = int(df.memory_usage().sum())
+            entry.nbytes += nbytes
+            self._nbytes += nbytes
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._nbytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._nbytes -= entry.nbytes
+
+
 class Client:
     """Client to interact with the blueskyapi.io API.
 
@@ -53,20 +342,113 @@ class Client:
     ``forecast_distances`` (integers), as well as any columns you
     select using the ``columns`` parameter.
 
+    The client is safe to share between threads, which then share its
+    pool of keep-alive connections: up to ``pool_maxsize`` per host,
+    further requests wait for a free connection. Identical requests
+    made while one of them is in flight wait for it and share its
+    response and ``pandas.DataFrame`` (as a copy), instead of each
+    calling the API. Close the client when done, or use it as a
+    context manager::
+
+        with blueskyapi.Client() as client:
+            client.latest_forecast(52.5, 13.5)
+
+    With ``grid_resolution``, coordinates are snapped to the nearest
+    point of a grid with that spacing in degrees before requesting
+    them, so all locations within one cell of the forecast model share
+    requests and cache entries. Results for many points still have the
+    original coordinates of each point.
+
+    Latest forecasts are requested again as conditional requests when
+    the API sent an ``ETag`` or ``Last-Modified`` header, and parsed
+    again only when they changed. For this, the client keeps up to
+    ``revalidation_bytes`` of the latest responses, each with the
+    DataFrames parsed from it. Every caller gets a copy of these
+    DataFrames, so a parsed latest forecast takes up memory twice while
+    the caller holds it.
+
     :param api_key: Your API key (create one `here <https://blueskyapi.io/api-keys>`_).
     :param base_url: Only for testing purposes. Don't use this parameter.
+    :param cache: Where to cache responses (see :mod:`blueskyapi.cache`), ``None`` to disable caching.
+    :param dataframe_cache: Where to keep parsed results in memory, ``None`` to disable it.
+    :param rate_limiter: How to throttle and retry requests (see :mod:`blueskyapi.ratelimit`), ``None`` to send them right away and raise errors immediately.
+    :param observers: Objects notified about every request and parsed response (see :mod:`blueskyapi.instrumentation`).
+    :param grid_resolution: Spacing in degrees to snap coordinates to, e.g. ``0.25`` for a quarter-degree model, ``None`` to use them as they are.
+    :param pool_connections: Number of hosts to keep connection pools for.
+    :param pool_maxsize: Maximum number of connections per host.
+    :param keep_alive: Reuse connections between requests.
+    :param timeout: Seconds to wait for the server, either one value or a ``(connect, read)`` pair, ``None`` to wait forever.
+    :param process_parser: Worker processes to parse large responses in (see :mod:`blueskyapi.processes`), ``None`` to parse them in the calling thread.
+    :param concurrency_limiter: How many requests to have in flight at once, adapted to the API's responses (see :class:`blueskyapi.ratelimit.ConcurrencyLimiter`), ``None`` for as many as are made.
+    :param revalidation_bytes: Memory for latest forecasts kept to send conditional requests for, ``None`` or ``0`` to send plain requests and keep nothing.
     """
 
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        cache: Optional[Cache] = None,
+        dataframe_cache: Optional[DataFrameCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        observers: Iterable[Observer] = (),
+        grid_resolution: Optional[float] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        keep_alive: bool = True,
+        timeout: Union[float, Tuple[float, float], None] = None,
+        process_parser: Optional["ProcessParser"] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        revalidation_bytes: Optional[int] = 2**26,
+    ):
+        if grid_resolution is not None and grid_resolution <= 0:
+            raise ValueError(
+                f"grid_resolution should be positive, got {grid_resolution}"
+            )
+
         self.api_key = api_key or default_config.api_key
         self.base_url = base_url or default_config.base_url
+        self.cache = cache
+        self.dataframe_cache = dataframe_cache
+        self.rate_limiter = rate_limiter
+        self.observers = list(observers)
+        self.grid_resolution = grid_resolution
+        self.timeout = timeout
+        self.process_parser = process_parser
+        self.concurrency_limiter = concurrency_limiter
+        self._validated = (
+            _ValidatedResponses(revalidation_bytes) if revalidation_bytes else None
+        )
+        self._requests_in_flight = _SingleFlight()
+        self._dataframes_in_flight = _SingleFlight()
 
         self.session = requests.Session()
-        self.session.headers.update({"User-Agent": self._user_agent()})
+        self.session.headers.update(
+            {"User-Agent": self._user_agent(), "Accept-Encoding": _accept_encoding()}
+        )
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
         if self.api_key is not None:
             self.session.headers.update({"Authorization": f"Bearer {self.api_key}"})
 
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def latest_forecast(
         self,
         lat: float,
@@ -74,28 +456,173 @@ class Client:
         forecast_distances: Iterable[int] = None,
         columns: Iterable[str] = None,
         dataset: Optional[str] = None,
-    ) -> pd.DataFrame:
+        compact: bool = False,
+        format: str = "json",
+        raw: bool = False,
+    ) -> Union["pd.DataFrame", List[Dict[str, Any]]]:
         """Obtain the latest forecast.
 
+        With ``raw``, the forecast is returned as the list of records
+        sent by the API, e.g. ``[{"forecast_moment": "2021-12-27T18:00:00Z",
+        "forecast_distance": 0, ...}, ...]``, without importing ``pandas``.
+
         :param lat: Latitude for which to fetch the forecast.
         :param lon: Longitude for which to fetch the forecast.
         :param forecast_distances: Forecast distances to fetch data for (hours from ``forecast_moment``).
         :param columns: Which variables to fetch (see `this page for available variables <https://blueskyapi.io/docs/data>`_).
         :param dataset: Which dataset to fetch data from (only for users on the Professional plan).
+        :param compact: Return smaller data types to save memory (see :func:`blueskyapi.parsing.create_dataframe`).
+        :param format: ``"arrow"`` or ``"parquet"`` to request a binary columnar response, which is faster to transfer and decode (requires ``pyarrow``). Falls back to JSON when the server or the installation doesn't support it.
+        :param raw: Return a list of dicts instead of a ``pandas.DataFrame``.
         """
-        response = self._get(
+        params = dict(
+            lat=_snap(lat, self.grid_resolution),
+            lon=_snap(lon, self.grid_resolution),
+            **self._latest_forecast_params(forecast_distances, columns, dataset),
+        )
+        if raw:
+            if format != "json":
+                raise ValueError(f"raw results are always JSON, got format={format}")
+            return _loads(self._get("/forecasts/latest", params))
+
+        return self._get_dataframe(
             "/forecasts/latest",
-            params=dict(
-                lat=lat,
-                lon=lon,
-                forecast_distances=_prepare_comma_separated_list(
-                    forecast_distances, "forecast_distances"
-                ),
-                columns=_prepare_comma_separated_list(columns, "columns"),
-                dataset=dataset,
-            ),
+            params=params,
+            compact=compact,
+            accept=_prepare_format(format),
+        )
+
+    def latest_forecast_many(
+        self,
+        points: Iterable[Tuple[float, float]],
+        forecast_distances: Iterable[int] = None,
+        columns: Iterable[str] = None,
+        dataset: Optional[str] = None,
+        compact: bool = False,
+        format: str = "json",
+        max_workers: int = 10,
+    ) -> "pd.DataFrame":
+        """Obtain the latest forecast for many locations at once.
+
+        The forecasts are fetched concurrently and returned as a single
+        ``pandas.DataFrame`` with additional ``lat`` and ``lon`` columns,
+        in the order of ``points``.
+
+        :param points: Pairs of ``(lat, lon)``, e.g. a list of tuples or an array of shape ``(n, 2)``.
+        :param forecast_distances: Forecast distances to fetch data for (hours from ``forecast_moment``).
+        :param columns: Which variables to fetch (see `this page for available variables <https://blueskyapi.io/docs/data>`_).
+        :param dataset: Which dataset to fetch data from (only for users on the Professional plan).
+        :param compact: Return smaller data types to save memory (see :func:`blueskyapi.parsing.create_dataframe`).
+        :param format: ``"arrow"`` or ``"parquet"`` to request a binary columnar response, which is faster to transfer and decode (requires ``pyarrow``). Falls back to JSON when the server or the installation doesn't support it.
+        :param max_workers: Maximum number of requests in flight at the same time.
+        """
+        return self._get_many(
+            "/forecasts/latest",
+            _prepare_points(points, "points"),
+            self._latest_forecast_params(forecast_distances, columns, dataset),
+            compact,
+            _prepare_format(format),
+            max_workers,
+        )
+
+    def latest_forecast_moment(
+        self, lat: float, lon: float, dataset: Optional[str] = None
+    ) -> "Optional[pd.Timestamp]":
+        """Obtain the ``forecast_moment`` of the latest forecast run.
+
+        Returns ``None`` if there is no forecast for the location. Only
+        fetches the first forecast distance. Like all requests for
+        latest forecasts, it's sent as a conditional request when the
+        API provided an ``ETag`` or ``Last-Modified`` header before, so
+        checking again before a new run arrives transfers almost
+        nothing.
+
+        :param lat: Latitude for which to check the forecast.
+        :param lon: Longitude for which to check the forecast.
+        :param dataset: Which dataset to check (only for users on the Professional plan).
+        """
+        records = self.latest_forecast(
+            lat, lon, forecast_distances=[0], dataset=dataset, raw=True
+        )
+        return max(
+            (_to_utc_timestamp(r["forecast_moment"]) for r in records), default=None
+        )
+
+    def has_new_forecast(
+        self,
+        lat: float,
+        lon: float,
+        since: Optional[Union[datetime, str]],
+        dataset: Optional[str] = None,
+    ) -> bool:
+        """Check whether a forecast run newer than ``since`` is available.
+
+        Returns ``False`` while there is no forecast for the location.
+
+        Lets pollers skip fetching and parsing full forecasts until a
+        new run arrives::
+
+            latest = None
+            while True:
+                if client.has_new_forecast(lat, lon, since=latest):
+                    df = client.latest_forecast(lat, lon)
+                    latest = df.forecast_moment.max()
+                time.sleep(60)
+
+        :param lat: Latitude for which to check the forecast.
+        :param lon: Longitude for which to check the forecast.
+        :param since: The latest ``forecast_moment`` already seen, ``None`` if none was seen yet.
+        :param dataset: Which dataset to check (only for users on the Professional plan).
+        """
+        _prepare_datetime(since, "since")
+        latest = self.latest_forecast_moment(lat, lon, dataset)
+        if latest is None:
+            return False
+        return since is None or latest > _to_utc_timestamp(since)
+
+    def prepare_latest(
+        self,
+        forecast_distances: Iterable[int] = None,
+        columns: Iterable[str] = None,
+        dataset: Optional[str] = None,
+        compact: bool = False,
+        format: str = "json",
+        raw: bool = False,
+    ) -> "PreparedQuery":
+        """Prepare a latest forecast query to run for many locations.
+
+        The parameters are validated and encoded once, and the HTTP
+        request is prepared once, so each call only fills in the
+        location. This saves about a millisecond per call compared to
+        :meth:`latest_forecast`, which matters when polling in a tight
+        loop::
+
+            query = client.prepare_latest(columns=["temperature_at_2m"])
+            while True:
+                for lat, lon in locations:
+                    handle(query(lat, lon))
+
+        Prepared requests use the session's headers and settings from
+        the time the query was prepared. Other requests of the client
+        aren't affected.
+
+        See :meth:`latest_forecast` for the parameters.
+        """
+        if raw and format != "json":
+            raise ValueError(f"raw results are always JSON, got format={format}")
+
+        endpoint = "/forecasts/latest"
+        accept = _prepare_format(format)
+        params = self._latest_forecast_params(forecast_distances, columns, dataset)
+        return PreparedQuery(
+            self,
+            endpoint,
+            {name: value for name, value in params.items() if value is not None},
+            compact,
+            accept,
+            raw,
+            _RequestTemplate(self.session, self._url(endpoint), accept, self.timeout),
         )
-        return _create_dataframe(response)
 
     def forecast_history(
         self,
@@ -106,9 +633,19 @@ class Client:
         forecast_distances: Optional[Iterable[int]] = None,
         columns: Optional[Iterable[str]] = None,
         dataset: Optional[str] = None,
-    ) -> pd.DataFrame:
+        compact: bool = False,
+        format: str = "json",
+        chunk_size: Optional[timedelta] = None,
+        max_workers: int = 4,
+        chunk_retries: int = 2,
+    ) -> "pd.DataFrame":
         """Obtain historical forecasts.
 
+        Long time ranges can be split into chunks of ``chunk_size``,
+        which are fetched concurrently and retried individually when
+        they fail. The result is the same as fetching the whole range
+        at once.
+
         :param lat: Latitude for which to fetch the forecasts.
         :param lon: Longitude for which to fetch the forecasts.
         :param min_forecast_moment: The first forecast moment to include.
@@ -116,34 +653,504 @@ class Client:
         :param forecast_distances: Forecast distances to return data for (hours from ``forecast_moment``).
         :param columns: Which variables to fetch (see `this page for available variables <https://blueskyapi.io/docs/data>`_).
         :param dataset: Which dataset to fetch data from (only for users on the Professional plan).
+        :param compact: Return smaller data types to save memory (see :func:`blueskyapi.parsing.create_dataframe`).
+        :param format: ``"arrow"`` or ``"parquet"`` to request a binary columnar response, which is faster to transfer and decode (requires ``pyarrow``). Falls back to JSON when the server or the installation doesn't support it.
+        :param chunk_size: Length of the time range fetched per request, ``None`` to fetch everything in one request. Requires ``min_forecast_moment``.
+        :param max_workers: Maximum number of chunks fetched at the same time.
+        :param chunk_retries: How often to retry a chunk after rate limiting, server or connection errors, waiting like a :class:`blueskyapi.ratelimit.RateLimiter`. Ignored when the client has a ``rate_limiter``, which retries the requests itself.
+        """
+        accept = _prepare_format(format)
+        if chunk_size is None:
+            return self._get_dataframe(
+                "/forecasts/history",
+                params=dict(
+                    lat=_snap(lat, self.grid_resolution),
+                    lon=_snap(lon, self.grid_resolution),
+                    **self._forecast_history_params(
+                        min_forecast_moment,
+                        max_forecast_moment,
+                        forecast_distances,
+                        columns,
+                        dataset,
+                    ),
+                ),
+                compact=compact,
+                accept=accept,
+            )
+
+        params = dict(
+            lat=_snap(lat, self.grid_resolution),
+            lon=_snap(lon, self.grid_resolution),
+            **self._latest_forecast_params(forecast_distances, columns, dataset),
+        )
+
+        def get_chunk(window: Tuple["pd.Timestamp", "pd.Timestamp"]) -> "pd.DataFrame":
+            return self._get_history_chunk(
+                params, window, compact, accept, chunk_retries
+            )
+
+        windows = self._history_windows(
+            min_forecast_moment, max_forecast_moment, chunk_size
+        )
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            chunks = list(executor.map(get_chunk, windows))
+
+        import pandas as pd
+
+        from blueskyapi.parsing import _concat
+
+        if not chunks:
+            # The time range is empty, like the API's answer would be.
+            return pd.DataFrame()
+        df = _concat(chunks)
+        if {"forecast_moment", "forecast_distance"} <= set(df.columns):
+            df = df.drop_duplicates(
+                ["forecast_moment", "forecast_distance"], ignore_index=True
+            )
+        return df
+
+    def iter_forecast_history(
+        self,
+        lat: float,
+        lon: float,
+        min_forecast_moment: Union[datetime, str],
+        max_forecast_moment: Optional[Union[datetime, str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+        columns: Optional[Iterable[str]] = None,
+        dataset: Optional[str] = None,
+        compact: bool = False,
+        format: str = "json",
+        chunk_size: timedelta = timedelta(days=7),
+        chunk_retries: int = 2,
+    ) -> Iterator["pd.DataFrame"]:
+        """Obtain historical forecasts chunk by chunk.
+
+        Fetches one chunk of ``chunk_size`` at a time and yields it as
+        a ``pandas.DataFrame``, so long time ranges can be processed
+        without holding all of them in memory::
+
+            for chunk in client.iter_forecast_history(
+                52.5, 13.5, min_forecast_moment="2021-01-01T00:00:00Z"
+            ):
+                chunk.to_parquet(...)
+
+        :param lat: Latitude for which to fetch the forecasts.
+        :param lon: Longitude for which to fetch the forecasts.
+        :param min_forecast_moment: The first forecast moment to include.
+        :param max_forecast_moment: The last forecast moment to include, ``None`` for up to now.
+        :param forecast_distances: Forecast distances to return data for (hours from ``forecast_moment``).
+        :param columns: Which variables to fetch (see `this page for available variables <https://blueskyapi.io/docs/data>`_).
+        :param dataset: Which dataset to fetch data from (only for users on the Professional plan).
+        :param compact: Return smaller data types to save memory (see :func:`blueskyapi.parsing.create_dataframe`).
+        :param format: ``"arrow"`` or ``"parquet"`` to request a binary columnar response, which is faster to transfer and decode (requires ``pyarrow``). Falls back to JSON when the server or the installation doesn't support it.
+        :param chunk_size: Length of the time range fetched per chunk.
+        :param chunk_retries: How often to retry a chunk after rate limiting, server or connection errors, waiting like a :class:`blueskyapi.ratelimit.RateLimiter`. Ignored when the client has a ``rate_limiter``, which retries the requests itself.
         """
-        response = self._get(
+        params = dict(
+            lat=_snap(lat, self.grid_resolution),
+            lon=_snap(lon, self.grid_resolution),
+            **self._latest_forecast_params(forecast_distances, columns, dataset),
+        )
+        accept = _prepare_format(format)
+        windows = self._history_windows(
+            min_forecast_moment, max_forecast_moment, chunk_size
+        )
+
+        def chunks() -> Iterator["pd.DataFrame"]:
+            previous_max_moment = None
+            for window in windows:
+                df = self._get_history_chunk(
+                    params, window, compact, accept, chunk_retries
+                )
+                if previous_max_moment is not None and "forecast_moment" in df:
+                    df = df[df.forecast_moment > previous_max_moment]
+                    df = df.reset_index(drop=True)
+                previous_max_moment = window[1]
+                yield df
+
+        return chunks()
+
+    def forecast_history_many(
+        self,
+        points: Iterable[Tuple[float, float]],
+        min_forecast_moment: Optional[Union[datetime, str]] = None,
+        max_forecast_moment: Optional[Union[datetime, str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+        columns: Optional[Iterable[str]] = None,
+        dataset: Optional[str] = None,
+        compact: bool = False,
+        format: str = "json",
+        max_workers: int = 10,
+    ) -> "pd.DataFrame":
+        """Obtain historical forecasts for many locations at once.
+
+        The forecasts are fetched concurrently and returned as a single
+        ``pandas.DataFrame`` with additional ``lat`` and ``lon`` columns,
+        in the order of ``points``.
+
+        :param points: Pairs of ``(lat, lon)``, e.g. a list of tuples or an array of shape ``(n, 2)``.
+        :param min_forecast_moment: The first forecast moment to include.
+        :param max_forecast_moment: The last forecast moment to include.
+        :param forecast_distances: Forecast distances to return data for (hours from ``forecast_moment``).
+        :param columns: Which variables to fetch (see `this page for available variables <https://blueskyapi.io/docs/data>`_).
+        :param dataset: Which dataset to fetch data from (only for users on the Professional plan).
+        :param compact: Return smaller data types to save memory (see :func:`blueskyapi.parsing.create_dataframe`).
+        :param format: ``"arrow"`` or ``"parquet"`` to request a binary columnar response, which is faster to transfer and decode (requires ``pyarrow``). Falls back to JSON when the server or the installation doesn't support it.
+        :param max_workers: Maximum number of requests in flight at the same time.
+        """
+        return self._get_many(
+            "/forecasts/history",
+            _prepare_points(points, "points"),
+            self._forecast_history_params(
+                min_forecast_moment,
+                max_forecast_moment,
+                forecast_distances,
+                columns,
+                dataset,
+            ),
+            compact,
+            _prepare_format(format),
+            max_workers,
+        )
+
+    def _latest_forecast_params(
+        self,
+        forecast_distances: Optional[Iterable[int]],
+        columns: Optional[Iterable[str]],
+        dataset: Optional[str],
+    ) -> dict:
+        return dict(
+            forecast_distances=_prepare_comma_separated_list(
+                forecast_distances, "forecast_distances"
+            ),
+            columns=_prepare_comma_separated_list(columns, "columns"),
+            dataset=dataset,
+        )
+
+    def _forecast_history_params(
+        self,
+        min_forecast_moment: Optional[Union[datetime, str]],
+        max_forecast_moment: Optional[Union[datetime, str]],
+        forecast_distances: Optional[Iterable[int]],
+        columns: Optional[Iterable[str]],
+        dataset: Optional[str],
+    ) -> dict:
+        return dict(
+            min_forecast_moment=_prepare_datetime(
+                min_forecast_moment, "min_forecast_moment"
+            ),
+            max_forecast_moment=_prepare_datetime(
+                max_forecast_moment, "max_forecast_moment"
+            ),
+            **self._latest_forecast_params(forecast_distances, columns, dataset),
+        )
+
+    def _history_windows(
+        self,
+        min_forecast_moment: Optional[Union[datetime, str]],
+        max_forecast_moment: Optional[Union[datetime, str]],
+        chunk_size: timedelta,
+    ) -> List[Tuple["pd.Timestamp", "pd.Timestamp"]]:
+        _prepare_datetime(min_forecast_moment, "min_forecast_moment")
+        _prepare_datetime(max_forecast_moment, "max_forecast_moment")
+        if min_forecast_moment is None:
+            raise ValueError("min_forecast_moment is required when using chunk_size")
+
+        return _split_time_range(
+            _to_utc_timestamp(min_forecast_moment),
+            _to_utc_timestamp(max_forecast_moment or datetime.now(timezone.utc)),
+            chunk_size,
+        )
+
+    def _get_history_chunk(
+        self,
+        params: dict,
+        window: Tuple["pd.Timestamp", "pd.Timestamp"],
+        compact: bool,
+        accept: Optional[str],
+        retries: int,
+    ) -> "pd.DataFrame":
+        min_moment, max_moment = window
+        return self._get_dataframe_with_retries(
             "/forecasts/history",
             params=dict(
-                lat=lat,
-                lon=lon,
-                min_forecast_moment=_prepare_datetime(
-                    min_forecast_moment, "min_forecast_moment"
-                ),
-                max_forecast_moment=_prepare_datetime(
-                    max_forecast_moment, "max_forecast_moment"
-                ),
-                forecast_distances=_prepare_comma_separated_list(
-                    forecast_distances, "forecast_distances"
-                ),
-                columns=_prepare_comma_separated_list(columns, "columns"),
-                dataset=dataset,
+                params,
+                min_forecast_moment=min_moment.isoformat(),
+                max_forecast_moment=max_moment.isoformat(),
             ),
+            compact=compact,
+            accept=accept,
+            retries=retries,
         )
-        return _create_dataframe(response)
 
-    def _get(self, endpoint: str, params: dict = {}) -> bytes:
-        url = self._url(endpoint)
-        response = self.session.get(url, params=params)
-        if response.ok:
-            return response.text
-        else:
-            raise errors.request_error_from_response(response)
+    def _get_many(
+        self,
+        endpoint: str,
+        points: List[Tuple[float, float]],
+        params: dict,
+        compact: bool,
+        accept: Optional[str],
+        max_workers: int,
+        template: Optional[_RequestTemplate] = None,
+    ) -> "pd.DataFrame":
+        def get(cell: Tuple[float, float]) -> bytes:
+            lat, lon = cell
+            return self._get(
+                endpoint, dict(lat=lat, lon=lon, **params), accept, template
+            )
+
+        # Each grid cell is fetched and parsed once, however many points it holds.
+        cells = [
+            (_snap(lat, self.grid_resolution), _snap(lon, self.grid_resolution))
+            for lat, lon in points
+        ]
+        unique_cells = list(dict.fromkeys(cells))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            responses = list(executor.map(get, unique_cells))
+
+        def parse() -> "pd.DataFrame":
+            from blueskyapi import parsing
+
+            parser = self.process_parser or parsing
+            df = parser.create_points_dataframe(unique_cells, responses, compact)
+            if cells == points and len(unique_cells) == len(cells):
+                return df
+            return _fan_out(df, cells, points)
+
+        return self._parse(endpoint, parse)
+
+    def _get_dataframe(
+        self,
+        endpoint: str,
+        params: dict,
+        compact: bool = False,
+        accept: Optional[str] = None,
+        template: Optional[_RequestTemplate] = None,
+    ) -> "pd.DataFrame":
+        response_key = _cache_key(self._url(endpoint), params, accept)
+        key = response_key + "#compact" if compact else response_key
+
+        # Returns a DataFrame that no caller receives, only copies of it.
+        def get() -> "pd.DataFrame":
+            from blueskyapi import parsing
+
+            response = self._get(endpoint, params, accept, template)
+            validated = (
+                None if self._validated is None else self._validated.get(response_key)
+            )
+            if validated is None or validated.response is not response:
+                validated = None
+            elif compact in validated.dataframes:
+                # The API answered 304 Not Modified, so nothing to parse.
+                return validated.dataframes[compact]
+
+            parser = self.process_parser or parsing
+            df = self._parse(
+                endpoint, lambda: parser.create_dataframe(response, compact)
+            )
+            if validated is not None:
+                self._validated.add_dataframe(response_key, validated, compact, df)
+            if self.dataframe_cache is not None:
+                ttl = (
+                    None
+                    if _is_immutable(endpoint, params)
+                    else self.dataframe_cache.ttl
+                )
+                self.dataframe_cache.set(key, df, ttl)
+            return df
+
+        if self.dataframe_cache is not None:
+            cached = self.dataframe_cache.get(key)
+            if cached is not None:
+                return cached
+
+        df, _ = self._dataframes_in_flight.do(key, get)
+        # Every caller, including the one that made the request, gets a
+        # DataFrame of its own to modify.
+        return df.copy()
+
+    def _get_dataframe_with_retries(
+        self,
+        endpoint: str,
+        params: dict,
+        compact: bool,
+        accept: Optional[str],
+        retries: int,
+    ) -> "pd.DataFrame":
+        # The rate limiter already retries every request, don't retry on top.
+        if self.rate_limiter is not None:
+            return self._get_dataframe(endpoint, params, compact, accept)
+
+        attempt = 0
+        while True:
+            try:
+                return self._get_dataframe(endpoint, params, compact, accept)
+            except (
+                errors.RequestError,
+                requests.ConnectionError,
+                requests.Timeout,
+            ) as error:
+                response = (
+                    error.response if isinstance(error, errors.RequestError) else None
+                )
+                delay = _retry_delay(attempt, response, retries)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    def _parse(
+        self, endpoint: str, parse: Callable[[], "pd.DataFrame"]
+    ) -> "pd.DataFrame":
+        start = time.perf_counter()
+        df = parse()
+        self._notify(
+            "on_parse", ParseEvent(endpoint, len(df), time.perf_counter() - start)
+        )
+        return df
+
+    def _get(
+        self,
+        endpoint: str,
+        params: dict = {},
+        accept: Optional[str] = None,
+        template: Optional[_RequestTemplate] = None,
+    ) -> bytes:
+        key = _cache_key(self._url(endpoint), params, accept)
+
+        revalidate = endpoint == _revalidated_endpoint and self._validated is not None
+
+        def get() -> bytes:
+            validated = self._validated.get(key) if revalidate else None
+            headers = {} if accept is None else {"Accept": accept}
+            if validated is not None:
+                headers.update(validated.conditions())
+
+            response = self._request(endpoint, params, headers, template)
+            if (
+                validated is not None
+                and response.status_code == requests.codes.not_modified
+            ):
+                body = validated.response
+            else:
+                body = response.content
+                validated = _Validated.from_response(response) if revalidate else None
+                if validated is not None:
+                    self._validated.set(key, validated)
+
+            if self.cache is not None:
+                ttl = None if _is_immutable(endpoint, params) else self.cache.ttl
+                self.cache.set(key, body, ttl)
+            return body
+
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._notify(
+                    "on_request",
+                    RequestEvent(
+                        endpoint, params, response_bytes=len(cached), cached=True
+                    ),
+                )
+                return cached
+
+        response, _ = self._requests_in_flight.do(key, get)
+        return response
+
+    def _request(
+        self,
+        endpoint: str,
+        params: dict,
+        headers: Dict[str, str],
+        template: Optional[_RequestTemplate] = None,
+    ) -> requests.Response:
+        event = RequestEvent(endpoint, params)
+        start = time.perf_counter()
+        try:
+            return self._request_with_retries(
+                self._url(endpoint), params, headers, event, template
+            )
+        except Exception as error:
+            event.error = error
+            raise
+        finally:
+            event.duration = time.perf_counter() - start
+            self._notify("on_request", event)
+
+    def _request_with_retries(
+        self,
+        url: str,
+        params: dict,
+        headers: Dict[str, str],
+        event: RequestEvent,
+        template: Optional[_RequestTemplate] = None,
+    ) -> requests.Response:
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = self._send(url, params, headers, event, template)
+            except (requests.ConnectionError, requests.Timeout):
+                delay = self._retry_delay(event.retries, None)
+                if delay is None:
+                    raise
+            else:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.update(response)
+                if response.ok:
+                    return response
+
+                delay = self._retry_delay(event.retries, response)
+                if delay is None:
+                    raise errors.request_error_from_response(response)
+
+            time.sleep(delay)
+            event.retries += 1
+
+    def _send(
+        self,
+        url: str,
+        params: dict,
+        headers: Dict[str, str],
+        event: RequestEvent,
+        template: Optional[_RequestTemplate] = None,
+    ) -> requests.Response:
+        limiter = self.concurrency_limiter
+        slot = None
+        if limiter is not None:
+            slot = limiter.acquire()
+            event.concurrency_limit = slot.limit
+
+        response = None
+        start = time.perf_counter()
+        try:
+            if template is not None:
+                response = template.send(params, headers)
+            else:
+                response = self.session.get(
+                    url, params=params, headers=headers, timeout=self.timeout
+                )
+        finally:
+            if slot is not None:
+                limiter.release(slot, response)
+        event.response = response
+        event.status_code = response.status_code
+        event.response_bytes = len(response.content)
+        event.time_to_headers = response.elapsed.total_seconds()
+        event.download = max(0.0, time.perf_counter() - start - event.time_to_headers)
+        return response
+
+    def _retry_delay(
+        self, attempt: int, response: Optional[requests.Response]
+    ) -> Optional[float]:
+        if self.rate_limiter is None:
+            return None
+        return self.rate_limiter.retry_delay(attempt, response)
+
+    def _notify(self, method: str, event: Union[RequestEvent, ParseEvent]) -> None:
+        for observer in self.observers:
+            getattr(observer, method)(event)
 
     def _url(self, endpoint: str) -> str:
         return self.base_url + endpoint
@@ -154,7 +1161,74 @@ class Client:
             [
                 f"blueskyapi-python/{__version__}",
                 f"python/{python_version}",
-                f"pandas/{pd.__version__}",
+                # Looked up without importing pandas, which is slow.
+                f"pandas/{importlib_metadata.version('pandas')}",
                 f"requests/{requests.__version__}",
             ]
         )
+
+
+class PreparedQuery:
+    """A query prepared with :meth:`Client.prepare_latest`.
+
+    Call it with a location to obtain its latest forecast, or use
+    :meth:`many` for several locations at once.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        endpoint: str,
+        params: dict,
+        compact: bool,
+        accept: Optional[str],
+        raw: bool,
+        template: _RequestTemplate,
+    ):
+        self.client = client
+        self.endpoint = endpoint
+        self.params = params
+        self.compact = compact
+        self.accept = accept
+        self.raw = raw
+        self._template = template
+
+    def __call__(
+        self, lat: float, lon: float
+    ) -> Union["pd.DataFrame", List[Dict[str, Any]]]:
+        """Obtain the latest forecast for a location.
+
+        :param lat: Latitude for which to fetch the forecast.
+        :param lon: Longitude for which to fetch the forecast.
+        """
+        resolution = self.client.grid_resolution
+        params = dict(
+            lat=_snap(lat, resolution), lon=_snap(lon, resolution), **self.params
+        )
+        if self.raw:
+            return _loads(
+                self.client._get(self.endpoint, params, template=self._template)
+            )
+        return self.client._get_dataframe(
+            self.endpoint, params, self.compact, self.accept, self._template
+        )
+
+    def many(
+        self, points: Iterable[Tuple[float, float]], max_workers: int = 10
+    ) -> "pd.DataFrame":
+        """Obtain the latest forecast for many locations at once.
+
+        Always returns a ``pandas.DataFrame``, see :meth:`Client.latest_forecast_many`.
+
+        :param points: Pairs of ``(lat, lon)``, e.g. a list of tuples or an array of shape ``(n, 2)``.
+        :param max_workers: Maximum number of requests in flight at the same time.
+        """
+        return self.client._get_many(
+            self.endpoint,
+            _prepare_points(points, "points"),
+            self.params,
+            self.compact,
+            self.accept,
+            max_workers,
+            self._template,
+        )
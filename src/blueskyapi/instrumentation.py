@@ -0,0 +1,166 @@
+"""
+Observers receive an event for every request a client makes and every
+response it parses, e.g. to find out whether slow calls are caused by
+the network, the server or parsing. :class:`MetricsCollector` keeps
+statistics about them in memory::
+
+    import blueskyapi
+    from blueskyapi.instrumentation import MetricsCollector
+
+    metrics = MetricsCollector()
+    client = blueskyapi.Client(observers=[metrics])
+    client.latest_forecast(52.5, 13.5)
+
+    metrics.summary()
+    # {'/forecasts/latest': {'requests': 1, 'duration': {'p50': 0.21, ...}, ...}}
+
+Write your own observer by subclassing :class:`Observer`.
+"""
+
+import threading
+from collections import defaultdict
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+
+
+if TYPE_CHECKING:
+    import requests
+
+
+@dataclass
+class RequestEvent:
+    """A request made by the client, including all its retries.
+
+    Durations are in seconds and refer to the last attempt, except for
+    ``duration`` which includes retries and waiting for the rate
+    limiter. ``time_to_headers`` covers connecting, sending the request
+    and waiting for the response headers, ``download`` reading the
+    body. ``response`` is the last response received, ``None`` if
+    there was none or the response came from the cache.
+    ``concurrency_limit`` is how many requests the client's
+    :class:`blueskyapi.ratelimit.ConcurrencyLimiter` allowed in flight
+    when the last attempt was sent, ``None`` without one.
+    """
+
+    endpoint: str
+    params: dict
+    status_code: Optional[int] = None
+    response_bytes: int = 0
+    time_to_headers: float = 0.0
+    download: float = 0.0
+    duration: float = 0.0
+    retries: int = 0
+    cached: bool = False
+    error: Optional[BaseException] = None
+    response: Optional["requests.Response"] = None
+    concurrency_limit: Optional[int] = None
+
+
+@dataclass
+class ParseEvent:
+    """A response parsed into a ``pandas.DataFrame``."""
+
+    endpoint: str
+    rows: int
+    duration: float
+
+
+class Observer:
+    """Base class for observers, ignoring all events."""
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Called after each request, whether it succeeded or not."""
+
+    def on_parse(self, event: ParseEvent) -> None:
+        """Called after parsing a response."""
+
+
+def _percentiles(values: Iterable[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    return {
+        f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+        for p in (50, 90, 99)
+    }
+
+
+class MetricsCollector(Observer):
+    """Collect request and parsing statistics per endpoint.
+
+    Counters cover all events, percentiles the last ``window`` events
+    per endpoint. With a :class:`blueskyapi.ratelimit.ConcurrencyLimiter`,
+    ``concurrency_limit`` is the limit of the latest request.
+
+    :param window: How many durations to keep per endpoint and metric.
+    """
+
+    _timings = ("duration", "time_to_headers", "download", "parse")
+
+    def __init__(self, window: int = 10000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        self._durations: Dict[str, Dict[str, Deque[float]]] = defaultdict(
+            lambda: {name: deque(maxlen=self.window) for name in self._timings}
+        )
+        self._concurrency_limits: Dict[str, int] = {}
+
+    def on_request(self, event: RequestEvent) -> None:
+        with self._lock:
+            counters = self._counters[event.endpoint]
+            counters["requests"] += 1
+            counters["retries"] += event.retries
+            counters["bytes"] += event.response_bytes
+            if event.cached:
+                counters["cache_hits"] += 1
+                return
+            if event.error is not None:
+                counters["errors"] += 1
+            if event.status_code is not None:
+                counters[f"status_{event.status_code}"] += 1
+            if event.concurrency_limit is not None:
+                self._concurrency_limits[event.endpoint] = event.concurrency_limit
+
+            durations = self._durations[event.endpoint]
+            durations["duration"].append(event.duration)
+            durations["time_to_headers"].append(event.time_to_headers)
+            durations["download"].append(event.download)
+
+    def on_parse(self, event: ParseEvent) -> None:
+        with self._lock:
+            self._counters[event.endpoint]["rows"] += event.rows
+            self._durations[event.endpoint]["parse"].append(event.duration)
+
+    def summary(self) -> Dict[str, dict]:
+        """Counters and 50th, 90th and 99th percentiles of durations per endpoint."""
+        with self._lock:
+            return {
+                endpoint: {
+                    **counters,
+                    **(
+                        {"concurrency_limit": self._concurrency_limits[endpoint]}
+                        if endpoint in self._concurrency_limits
+                        else {}
+                    ),
+                    **{
+                        name: _percentiles(self._durations[endpoint][name])
+                        for name in self._timings
+                    },
+                }
+                for endpoint, counters in self._counters.items()
+            }
+
+    def reset(self) -> None:
+        """Forget all collected statistics."""
+        with self._lock:
+            self._counters.clear()
+            self._durations.clear()
+            self._concurrency_limits.clear()
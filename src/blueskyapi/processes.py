@@ -0,0 +1,235 @@
+"""
+Parsing JSON holds the GIL, so with many large responses, e.g. from
+:meth:`blueskyapi.Client.forecast_history_many`, adding threads doesn't
+make parsing faster. A :class:`ProcessParser` parses large responses
+in worker processes instead, so parsing scales with the number of
+cores::
+
+    import blueskyapi
+    from blueskyapi.processes import ProcessParser
+
+    with ProcessParser(max_workers=4) as parser:
+        client = blueskyapi.Client(process_parser=parser)
+        df = client.forecast_history_many(points, min_forecast_moment="2021-01-01")
+
+On POSIX systems, the workers send the parsed columns back through
+shared memory, so they don't have to be pickled. Elsewhere, and on
+Python 3.7, which doesn't support shared memory, they are pickled
+instead.
+"""
+
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from blueskyapi import parsing
+
+
+try:
+    from multiprocessing import resource_tracker
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover, Python 3.7
+    resource_tracker = None
+    shared_memory = None
+
+if os.name != "posix":  # pragma: no cover
+    # Windows removes a block once its last handle is closed, i.e. before
+    # the parent process could open it, and has no resource tracker.
+    resource_tracker = None
+    shared_memory = None
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+Response = Union[str, bytes]
+
+# (name, kind, dtype, offset, length, extra): where to find a column in shared memory
+ColumnSpec = Tuple[str, str, str, int, int, Any]
+
+
+def _export(df: "pd.DataFrame") -> Tuple[str, int, List[ColumnSpec]]:
+    """Copy the columns of ``df`` into a new shared memory block."""
+    import numpy as np
+    import pandas as pd
+
+    columns = []
+    for name, column in df.items():
+        if isinstance(column.dtype, pd.DatetimeTZDtype):
+            columns.append((name, "datetime", column.array.asi8, str(column.dtype.tz)))
+        elif isinstance(column.dtype, pd.CategoricalDtype):
+            categories = list(column.cat.categories)
+            columns.append((name, "category", column.cat.codes.to_numpy(), categories))
+        elif isinstance(column.dtype, np.dtype) and column.dtype.kind in "biuf":
+            columns.append((name, "array", column.to_numpy(), None))
+        else:
+            columns.append((name, "object", None, pickle.dumps(column.to_numpy())))
+
+    size = sum(array.nbytes for _, _, array, _ in columns if array is not None)
+    memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    # The parent process removes the block once it copied the columns.
+    resource_tracker.unregister(f"/{memory.name}", "shared_memory")
+
+    specs = []
+    offset = 0
+    try:
+        for name, kind, array, extra in columns:
+            if array is None:
+                specs.append((name, kind, "", 0, 0, extra))
+                continue
+            target = np.ndarray(
+                array.shape, array.dtype, buffer=memory.buf, offset=offset
+            )
+            target[:] = array
+            del target
+            specs.append((name, kind, array.dtype.str, offset, len(array), extra))
+            offset += array.nbytes
+    finally:
+        memory.close()
+    return memory.name, len(df), specs
+
+
+def _import(name: str, rows: int, specs: List[ColumnSpec]) -> "pd.DataFrame":
+    """Build a DataFrame from a shared memory block and remove the block."""
+    import numpy as np
+    import pandas as pd
+
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        columns = {}
+        for column, kind, dtype, offset, length, extra in specs:
+            if kind == "object":
+                columns[column] = pickle.loads(extra)
+                continue
+
+            array = np.ndarray(
+                (length,), np.dtype(dtype), buffer=memory.buf, offset=offset
+            ).copy()
+            if kind == "datetime":
+                columns[column] = (
+                    pd.DatetimeIndex(array.view("M8[ns]"))
+                    .tz_localize("UTC")
+                    .tz_convert(extra)
+                )
+            elif kind == "category":
+                columns[column] = pd.Categorical.from_codes(array, extra)
+            else:
+                columns[column] = array
+    finally:
+        memory.close()
+        memory.unlink()
+    return pd.DataFrame(columns, index=pd.RangeIndex(rows), copy=False)
+
+
+def _parse(
+    points: Optional[Sequence[Tuple[float, float]]],
+    responses: List[Response],
+    compact: bool,
+) -> Any:
+    if points is None:
+        df = parsing.create_dataframe(responses[0], compact)
+    else:
+        df = parsing.create_points_dataframe(points, responses, compact)
+
+    if shared_memory is None:
+        return df
+    return _export(df)
+
+
+class ProcessParser:
+    """Parse large responses in a pool of worker processes.
+
+    Offers the functions of :mod:`blueskyapi.parsing` that the client
+    uses. Responses smaller than ``min_bytes`` in total are parsed in
+    the calling process, where that's faster than handing them to a
+    worker.
+
+    :param max_workers: Number of worker processes, ``None`` for one per core.
+    :param min_bytes: Size of responses from which on to parse them in a worker.
+    :param batch_size: At most how many responses of different locations a worker parses at once. Fewer locations are split evenly across all workers.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        min_bytes: int = 2**20,
+        batch_size: int = 16,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_bytes = min_bytes
+        self.batch_size = batch_size
+        # Forking a process that runs the client's threads isn't safe.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def create_dataframe(
+        self, response: Response, compact: bool = False
+    ) -> "pd.DataFrame":
+        """Like :func:`blueskyapi.parsing.create_dataframe`."""
+        if len(response) < self.min_bytes:
+            return parsing.create_dataframe(response, compact)
+        return self._result(self._executor.submit(_parse, None, [response], compact))
+
+    def create_points_dataframe(
+        self,
+        points: Sequence[Tuple[float, float]],
+        responses: Iterable[Response],
+        compact: bool = False,
+    ) -> "pd.DataFrame":
+        """Like :func:`blueskyapi.parsing.create_points_dataframe`."""
+        responses = list(responses)
+        if sum(len(response) for response in responses) < self.min_bytes:
+            return parsing.create_points_dataframe(points, responses, compact)
+
+        # Keep every worker busy, each with one batch if possible.
+        size = max(1, min(self.batch_size, -(-len(responses) // self.max_workers)))
+        futures = [
+            self._executor.submit(
+                _parse,
+                points[start : start + size],
+                responses[start : start + size],
+                compact,
+            )
+            for start in range(0, len(responses), size)
+        ]
+        # Collect every result, even after an error, so no shared memory is left behind.
+        frames = []
+        error = None
+        for future in futures:
+            try:
+                frames.append(self._result(future))
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+        # Batches without any forecasts have no columns to agree on.
+        frames = [df for df in frames if len(df)] or frames[:1]
+        return parsing._concat(frames)
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ProcessParser":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _result(self, future: Future) -> "pd.DataFrame":
+        result = future.result()
+        if shared_memory is None:
+            return result
+        return _import(*result)
@@ -0,0 +1,330 @@
+"""
+By default, requests over the rate limit raise
+:class:`blueskyapi.errors.OverRateLimit`. A :class:`RateLimiter` instead
+spaces requests out and retries them when the API asks to slow down::
+
+    import blueskyapi
+    from blueskyapi.ratelimit import RateLimiter
+
+    client = blueskyapi.Client(rate_limiter=RateLimiter(requests_per_second=5))
+
+All threads using the client share the limiter, so the combined request
+rate stays below the limit.
+
+For bulk downloads, a :class:`ConcurrencyLimiter` finds out how many
+requests can be in flight at once without overloading the API, so
+``max_workers`` only needs to be an upper bound::
+
+    from blueskyapi.ratelimit import ConcurrencyLimiter
+
+    client = blueskyapi.Client(
+        concurrency_limiter=ConcurrencyLimiter(max_limit=32), pool_maxsize=32
+    )
+    client.forecast_history_many(points, max_workers=32)
+"""
+
+import email.utils
+import itertools
+import random
+import threading
+import time
+from collections import defaultdict
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque
+from typing import Dict
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+
+
+_retry_statuses = {
+    requests.codes.too_many_requests,
+    requests.codes.internal_server_error,
+    requests.codes.bad_gateway,
+    requests.codes.service_unavailable,
+    requests.codes.gateway_timeout,
+}
+
+# How many responses in a row have to be slow to count as congestion.
+_slow_responses = 3
+
+
+def _header(response: requests.Response, *names: str) -> Optional[str]:
+    for name in names:
+        value = response.headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+def _retry_delay(
+    attempt: int,
+    response: Optional[requests.Response],
+    retries: int,
+    backoff: float = 1.0,
+    max_backoff: float = 60.0,
+) -> Optional[float]:
+    """Like :meth:`RateLimiter.retry_delay`, but without pausing other requests."""
+    if attempt >= retries:
+        return None
+    if response is not None and response.status_code not in _retry_statuses:
+        return None
+
+    delay = None
+    if response is not None:
+        delay = _parse_retry_after(response.headers.get("Retry-After"))
+    if delay is None:
+        delay = min(max_backoff, backoff * 2**attempt)
+        delay = random.uniform(delay / 2, delay)
+    return delay
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    # Some APIs send a unix timestamp, others the number of seconds left.
+    if reset > 10**9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+class RateLimiter:
+    """Throttle requests and retry them on rate limiting and server errors.
+
+    Requests are spaced out to at most ``requests_per_second`` (with
+    bursts of up to ``burst`` requests). When the API reports its
+    remaining quota in ``RateLimit-Remaining``/``RateLimit-Reset``
+    headers (or their ``X-`` prefixed variants), the rate is lowered
+    to spread the remaining requests until the reset.
+
+    Requests failing with 429 or 5xx errors or connection errors are
+    retried up to ``retries`` times, waiting as long as the
+    ``Retry-After`` header asks for or otherwise with jittered
+    exponential backoff. After a 429, all threads pause.
+
+    :param requests_per_second: Maximum request rate, ``None`` for no fixed limit.
+    :param burst: How many requests may be sent at once after being idle.
+    :param retries: How often to retry a failing request.
+    :param backoff: Seconds to wait before the first retry, doubled for every further one.
+    :param max_backoff: Maximum seconds to wait between retries.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        burst: int = 1,
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        if requests_per_second is not None and requests_per_second <= 0:
+            raise ValueError(
+                f"requests_per_second should be positive, got {requests_per_second}"
+            )
+
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._quota_rate: Optional[float] = None
+        self._next_at = 0.0
+        self._paused_until = 0.0
+
+    @property
+    def rate(self) -> Optional[float]:
+        """The request rate currently enforced, ``None`` if unlimited."""
+        rates = [r for r in (self.requests_per_second, self._quota_rate) if r]
+        return min(rates) if rates else None
+
+    def acquire(self) -> None:
+        """Wait until the next request may be sent."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._paused_until)
+            rate = self.rate
+            if rate is not None:
+                interval = 1 / rate
+                start = max(start, self._next_at - (self.burst - 1) * interval)
+                self._next_at = max(self._next_at, start) + interval
+        if start > now:
+            time.sleep(start - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests for ``seconds``."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update(self, response: requests.Response) -> None:
+        """Adjust the rate to the quota reported by a response."""
+        remaining = _header(response, "RateLimit-Remaining", "X-RateLimit-Remaining")
+        reset = _parse_reset(_header(response, "RateLimit-Reset", "X-RateLimit-Reset"))
+        if remaining is None or reset is None:
+            return
+
+        try:
+            remaining_requests = float(remaining)
+        except ValueError:
+            return
+
+        if remaining_requests <= 0:
+            self.pause(reset)
+        elif reset > 0:
+            with self._lock:
+                self._quota_rate = remaining_requests / reset
+
+    def retry_delay(
+        self, attempt: int, response: Optional[requests.Response]
+    ) -> Optional[float]:
+        """Seconds to wait before retrying, or ``None`` if the request shouldn't be retried.
+
+        :param attempt: How many retries were made already.
+        :param response: The failed response, ``None`` after a connection error.
+        """
+        delay = _retry_delay(
+            attempt, response, self.retries, self.backoff, self.max_backoff
+        )
+        if (
+            delay is not None
+            and response is not None
+            and response.status_code == requests.codes.too_many_requests
+        ):
+            self.pause(delay)
+        return delay
+
+
+@dataclass
+class _Slot:
+    """A request admitted by a :class:`ConcurrencyLimiter`."""
+
+    limit: int
+    decreases: int
+    saturations: int
+
+
+class ConcurrencyLimiter:
+    """Adapt the number of requests in flight to how well the API copes.
+
+    Works like TCP congestion control: for every ``limit`` successful
+    requests, the limit grows by one, as long as the limit was reached
+    while they were in flight. When a request is rate limited, fails with
+    a server or connection error, or the server keeps taking more than
+    ``latency_tolerance`` times as long to answer as usual, the limit is
+    multiplied by ``backoff``. Usual is the 10th percentile of the last
+    ``window`` response times of the same endpoint, and only three slow
+    responses in a row count, so single outliers don't matter. Only requests sent after the last
+    decrease lower the limit again, so a burst of failures counts once.
+
+    Requests over the limit wait until another one finishes. The
+    current limit is available as :attr:`limit` and reported to
+    observers as :attr:`blueskyapi.instrumentation.RequestEvent.concurrency_limit`.
+
+    :param initial_limit: How many requests may be in flight at first.
+    :param min_limit: The lowest the limit may drop to.
+    :param max_limit: The highest the limit may grow to.
+    :param backoff: Factor to lower the limit by after a failure or slow response.
+    :param latency_tolerance: How much slower than usual responses may be, ``None`` to ignore response times.
+    :param window: How many response times to keep per endpoint.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        latency_tolerance: Optional[float] = 2.0,
+        window: int = 100,
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "limits should satisfy 1 <= min_limit <= initial_limit <= max_limit, "
+                f"got {min_limit}, {initial_limit}, {max_limit}"
+            )
+        if not 0 < backoff < 1:
+            raise ValueError(f"backoff should be between 0 and 1, got {backoff}")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.window = window
+
+        self._condition = threading.Condition()
+        self._window = float(initial_limit)
+        self._in_flight = 0
+        self._decreases = 0
+        self._saturations = 0
+        self._latencies: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.window)
+        )
+
+    @property
+    def limit(self) -> int:
+        """How many requests may currently be in flight."""
+        return int(self._window)
+
+    def acquire(self) -> _Slot:
+        """Wait until another request may be sent."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            slot = _Slot(self.limit, self._decreases, self._saturations)
+            self._in_flight += 1
+            if self._in_flight >= self.limit:
+                self._saturations += 1
+            return slot
+
+    def release(self, slot: _Slot, response: Optional[requests.Response]) -> None:
+        """Adjust the limit to the outcome of a request and let the next one in.
+
+        :param slot: What :meth:`acquire` returned for the request.
+        :param response: The response, ``None`` if the request failed.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if self._is_congested(response):
+                if slot.decreases == self._decreases:
+                    self._decreases += 1
+                    self._window = max(
+                        float(self.min_limit), self._window * self.backoff
+                    )
+            elif self._saturations > slot.saturations:
+                self._window = min(float(self.max_limit), self._window + 1 / slot.limit)
+            self._condition.notify_all()
+
+    def _is_congested(self, response: Optional[requests.Response]) -> bool:
+        if response is None or response.status_code in _retry_statuses:
+            return True
+        if self.latency_tolerance is None:
+            return False
+
+        latencies = self._latencies[urlparse(response.url).path]
+        latencies.append(response.elapsed.total_seconds())
+        if len(latencies) <= _slow_responses:
+            return False
+        usual = sorted(latencies)[len(latencies) // 10]
+        recent = itertools.islice(latencies, len(latencies) - _slow_responses, None)
+        return min(recent) > self.latency_tolerance * usual
@@ -0,0 +1,336 @@
+"""
+Exchanges with the API can be recorded and replayed by a local server,
+e.g. to run load tests and benchmarks offline. A :class:`Recording` is
+an observer that keeps every response the client receives::
+
+    import blueskyapi
+    from blueskyapi.replay import Recording
+    from blueskyapi.replay import ReplayServer
+
+    recording = Recording()
+    client = blueskyapi.Client(observers=[recording])
+    client.forecast_history_many(points, min_forecast_moment="2021-12-01")
+    recording.save("forecasts.zip")
+
+A :class:`ReplayServer` answers the recorded requests, optionally
+slowed down and with rate limiting and server errors mixed in::
+
+    from blueskyapi.ratelimit import RateLimiter
+
+    recording = Recording.load("forecasts.zip")
+    with ReplayServer(recording, latency=0.05, too_many_requests=0.1) as server:
+        client = blueskyapi.Client(base_url=server.url, rate_limiter=RateLimiter())
+        client.forecast_history_many(points, min_forecast_moment="2021-12-01")
+
+To serve responses that weren't recorded, e.g. synthetic forecasts,
+override :meth:`ReplayServer.respond` and build them with
+:meth:`Exchange.from_records`.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+from dataclasses import field
+from http.client import HTTPMessage
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import parse_qsl
+from urllib.parse import urlparse
+
+from blueskyapi.client import _media_types
+from blueskyapi.instrumentation import Observer
+from blueskyapi.instrumentation import RequestEvent
+
+
+# endpoint, sorted query parameters and Accept header of a request
+Key = Tuple[str, Tuple[Tuple[str, str], ...], str]
+
+_recorded_headers = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+
+def _key(endpoint: str, params: Iterable[Tuple[str, str]], accept: str) -> Key:
+    return endpoint, tuple(sorted(params)), accept
+
+
+@dataclass
+class Exchange:
+    """A recorded response to a request."""
+
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    _gzipped: Optional[bytes] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_records(cls, records: List[dict], format: str = "json") -> "Exchange":
+        """A successful response with ``records`` encoded like the API does.
+
+        :param records: Forecasts, like the ones returned with ``raw=True``.
+        :param format: ``"json"``, ``"arrow"`` or ``"parquet"`` (the latter two require ``pyarrow``).
+        """
+        if format == "json":
+            return cls(
+                200, {"Content-Type": "application/json"}, json.dumps(records).encode()
+            )
+
+        import pandas as pd
+        import pyarrow
+        from pyarrow import parquet
+
+        df = pd.DataFrame(records)
+        if "forecast_moment" in df:
+            df["forecast_moment"] = pd.to_datetime(df.forecast_moment, utc=True)
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        sink = io.BytesIO()
+        if format == "parquet":
+            parquet.write_table(table, sink)
+        else:
+            with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        return cls(200, {"Content-Type": _media_types[format]}, sink.getvalue())
+
+    def gzipped(self) -> bytes:
+        """The body compressed with gzip, compressed only once per exchange."""
+        # Handler threads may both compress it at first, either result is fine.
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class Recording(Observer):
+    """Responses received by a client, by endpoint, parameters and ``Accept`` header.
+
+    Pass it to a :class:`blueskyapi.Client` as an observer to record.
+    Responses from the cache and ``304 Not Modified`` responses aren't
+    recorded. When a request is made again, the latest response wins.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._exchanges: Dict[Key, Exchange] = {}
+
+    def on_request(self, event: RequestEvent) -> None:
+        response = event.response
+        if response is None or response.status_code == 304:
+            return
+        key = _key(
+            event.endpoint,
+            (
+                (name, str(value))
+                for name, value in event.params.items()
+                if value is not None
+            ),
+            response.request.headers.get("Accept", ""),
+        )
+        self.add(
+            key,
+            Exchange(
+                response.status_code,
+                {
+                    name: response.headers[name]
+                    for name in _recorded_headers
+                    if name in response.headers
+                },
+                response.content,
+            ),
+        )
+
+    def add(self, key: Key, exchange: Exchange) -> None:
+        """Record a response to the request ``key``."""
+        with self._lock:
+            self._exchanges[key] = exchange
+
+    def get(self, key: Key) -> Optional[Exchange]:
+        """The response recorded for the request ``key``, ``None`` if there is none."""
+        with self._lock:
+            return self._exchanges.get(key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._exchanges)
+
+    def save(self, path: str) -> None:
+        """Write the recording to a compressed file.
+
+        Identical bodies, e.g. of the same forecasts in different
+        formats, are stored only once.
+        """
+        with self._lock:
+            exchanges = list(self._exchanges.items())
+
+        index: List[dict] = []
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            stored = set()
+            for (endpoint, params, accept), exchange in exchanges:
+                digest = hashlib.sha256(exchange.body).hexdigest()
+                if digest not in stored:
+                    archive.writestr(f"bodies/{digest}", exchange.body)
+                    stored.add(digest)
+                index.append(
+                    dict(
+                        endpoint=endpoint,
+                        params=params,
+                        accept=accept,
+                        status_code=exchange.status_code,
+                        headers=exchange.headers,
+                        body=digest,
+                    )
+                )
+            archive.writestr("index.json", json.dumps(index))
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        """Read a recording written by :meth:`save`."""
+        recording = cls()
+        with zipfile.ZipFile(path) as archive:
+            bodies: Dict[str, bytes] = {}
+            for entry in json.loads(archive.read("index.json")):
+                digest = entry["body"]
+                if digest not in bodies:
+                    bodies[digest] = archive.read(f"bodies/{digest}")
+                recording.add(
+                    _key(
+                        entry["endpoint"],
+                        (tuple(param) for param in entry["params"]),
+                        entry["accept"],
+                    ),
+                    Exchange(entry["status_code"], entry["headers"], bodies[digest]),
+                )
+        return recording
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server: "ReplayServer" = self.server.replay
+        url = urlparse(self.path)
+        exchange = server.respond(
+            url.path, parse_qsl(url.query, keep_blank_values=True), self.headers
+        )
+
+        if server.latency:
+            time.sleep(server.latency)
+        failure = server._failure()
+        if failure is not None:
+            self._send(failure, {"Retry-After": str(server.retry_after)}, b"")
+        elif exchange is None:
+            self._send(
+                404, {"Content-Type": "application/json"}, b'{"detail": "Not recorded"}'
+            )
+        elif (
+            "ETag" in exchange.headers
+            and self.headers.get("If-None-Match") == exchange.headers["ETag"]
+        ):
+            self._send(304, {"ETag": exchange.headers["ETag"]}, b"")
+        else:
+            headers = dict(exchange.headers)
+            body = exchange.body
+            if body and "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = exchange.gzipped()
+                headers["Content-Encoding"] = "gzip"
+            self._send(exchange.status_code, headers, body)
+
+    def _send(self, status_code: int, headers: Dict[str, str], body: bytes) -> None:
+        self.send_response(status_code)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer:
+    """Answer recorded requests on a random local port in a background thread.
+
+    Unknown requests get a ``404``. Use as a context manager; ``url``
+    is the base URL to pass to the client.
+
+    :param recording: The responses to serve.
+    :param latency: Seconds to wait before answering each request.
+    :param too_many_requests: Share of requests to answer with ``429 Too Many Requests``.
+    :param errors: Share of requests to answer with ``503 Service Unavailable``.
+    :param retry_after: Value of the ``Retry-After`` header of these responses.
+    :param seed: Seed for choosing which requests fail, for reproducible runs.
+    """
+
+    def __init__(
+        self,
+        recording: Recording,
+        latency: float = 0.0,
+        too_many_requests: float = 0.0,
+        errors: float = 0.0,
+        retry_after: int = 1,
+        seed: Optional[int] = None,
+    ):
+        if too_many_requests + errors > 1:
+            raise ValueError(
+                f"too_many_requests + errors should be at most 1, got {too_many_requests + errors}"
+            )
+        self.recording = recording
+        self.latency = latency
+        self.too_many_requests = too_many_requests
+        self.errors = errors
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.replay = self
+        # A short poll interval, so leaving the context manager doesn't take long.
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.01,), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "ReplayServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(
+        self, endpoint: str, params: List[Tuple[str, str]], headers: HTTPMessage
+    ) -> Optional[Exchange]:
+        """The response to a request, ``None`` to answer with a ``404``.
+
+        Looks the request up in the recording. Override to serve other
+        responses.
+
+        :param endpoint: The path of the request, e.g. ``"/forecasts/latest"``.
+        :param params: The query parameters of the request.
+        :param headers: The headers of the request.
+        """
+        return self.recording.get(_key(endpoint, params, headers.get("Accept", "")))
+
+    def _failure(self) -> Optional[int]:
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.too_many_requests:
+            return 429
+        if draw < self.too_many_requests + self.errors:
+            return 503
+        return None
@@ -0,0 +1,554 @@
+"""
+Historical forecasts can be archived locally in a partitioned Parquet
+dataset and kept up to date incrementally. Only forecasts newer than
+the latest stored ``forecast_moment`` are downloaded, and only once
+the API won't update them anymore, so the archive never holds
+incomplete forecast runs::
+
+    import blueskyapi
+    from blueskyapi.sync import ParquetStore, sync_forecast_history
+
+    client = blueskyapi.Client()
+    store = ParquetStore("forecasts")
+
+    sync_forecast_history(
+        client, store, 52.5, 13.5, min_forecast_moment="2021-01-01T00:00:00Z"
+    )
+    berlin = store.read(52.5, 13.5)
+
+Requires ``pyarrow`` to be installed.
+
+For backtests, which read the same forecasts over and over, an
+:class:`ArrayStore` is faster: it memory-maps its columns, so queries
+only read the rows they need, and it answers
+:meth:`~ArrayStore.forecast_history` like a :class:`blueskyapi.Client`::
+
+    from blueskyapi.sync import ArrayStore
+
+    store = ArrayStore("forecasts")
+    sync_forecast_history(
+        client, store, 52.5, 13.5, min_forecast_moment="2021-01-01T00:00:00Z"
+    )
+    december = store.forecast_history(
+        52.5, 13.5, min_forecast_moment="2021-12-01", columns=["temperature_at_2m"]
+    )
+
+An :class:`ArrayStore` doesn't need ``pyarrow``.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from datetime import timedelta
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from blueskyapi.client import Client
+from blueskyapi.client import _history_settled_before
+from blueskyapi.client import _prepare_comma_separated_list
+from blueskyapi.client import _to_utc_timestamp
+from blueskyapi.parsing import _concat
+from blueskyapi.parsing import _is_integral
+from blueskyapi.parsing import _smallest_int_type
+
+
+_moment_format = "%Y%m%dT%H%M%SZ"
+
+
+class ParquetStore:
+    """A local archive of historical forecasts.
+
+    Forecasts are stored in one directory per dataset, selection of
+    columns and forecast distances, and location::
+
+        <path>/dataset=<dataset>/query=<hash>/lat=<lat>/lon=<lon>/part-<first>-<last>.parquet
+
+    The names of the parts contain the first and last forecast moment
+    they hold, so finding the latest stored forecast doesn't require
+    reading any data. New parts are written to a temporary file first
+    and then renamed, so readers never see incomplete files.
+
+    :param path: Root directory of the archive, created if it doesn't exist.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def partition_path(
+        self,
+        lat: float,
+        lon: float,
+        dataset: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+    ) -> str:
+        """Directory holding the forecasts for a location and selection."""
+        return _partition_path(
+            self.path, lat, lon, dataset, columns, forecast_distances
+        )
+
+    def latest_forecast_moment(
+        self,
+        lat: float,
+        lon: float,
+        dataset: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+    ) -> Optional[pd.Timestamp]:
+        """The latest stored forecast moment, ``None`` if nothing is stored yet."""
+        parts = self._parts(
+            self.partition_path(lat, lon, dataset, columns, forecast_distances)
+        )
+        if not parts:
+            return None
+        return max(_part_moments(part)[1] for part in parts)
+
+    def read(
+        self,
+        lat: float,
+        lon: float,
+        dataset: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+    ) -> pd.DataFrame:
+        """Read all stored forecasts for a location and selection."""
+        directory = self.partition_path(lat, lon, dataset, columns, forecast_distances)
+        parts = self._parts(directory)
+        if not parts:
+            return pd.DataFrame()
+        return _concat(
+            [pd.read_parquet(os.path.join(directory, part)) for part in parts]
+        )
+
+    def append(
+        self,
+        df: pd.DataFrame,
+        lat: float,
+        lon: float,
+        dataset: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Atomically add forecasts for a location and selection."""
+        if df.empty:
+            return
+
+        directory = self.partition_path(lat, lon, dataset, columns, forecast_distances)
+        os.makedirs(directory, exist_ok=True)
+
+        first = df.forecast_moment.min().strftime(_moment_format)
+        last = df.forecast_moment.max().strftime(_moment_format)
+        temporary_path = os.path.join(directory, f".tmp-{uuid.uuid4().hex}.parquet")
+        df.to_parquet(temporary_path, index=False)
+        os.replace(
+            temporary_path, os.path.join(directory, f"part-{first}-{last}.parquet")
+        )
+
+    def _parts(self, directory: str) -> List[str]:
+        return _parts(directory, ".parquet")
+
+
+class ArrayStore:
+    """A memory-mapped local archive of historical forecasts.
+
+    Uses the same directories as :class:`ParquetStore`, but every part
+    is a directory holding one NumPy array per column and an index of
+    their types::
+
+        <path>/dataset=<dataset>/query=<hash>/lat=<lat>/lon=<lon>/part-<first>-<last>/<column>.npy
+
+    The rows of a part are sorted by ``forecast_moment`` and
+    ``forecast_distance``. Queries only open the parts whose forecast
+    moments overlap the requested ones, find the first and last row by
+    binary search on the memory-mapped ``forecast_moment`` array and
+    only read those rows of the requested columns from disk.
+
+    Only columns of a fixed width can be stored: numbers, booleans,
+    datetimes and categories.
+
+    :param path: Root directory of the archive, created if it doesn't exist.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def partition_path(
+        self,
+        lat: float,
+        lon: float,
+        dataset: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+    ) -> str:
+        """Directory holding the forecasts for a location and selection."""
+        return _partition_path(
+            self.path, lat, lon, dataset, columns, forecast_distances
+        )
+
+    def latest_forecast_moment(
+        self,
+        lat: float,
+        lon: float,
+        dataset: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+    ) -> Optional[pd.Timestamp]:
+        """The latest stored forecast moment, ``None`` if nothing is stored yet."""
+        parts = _parts(
+            self.partition_path(lat, lon, dataset, columns, forecast_distances), ""
+        )
+        if not parts:
+            return None
+        return max(_part_moments(part)[1] for part in parts)
+
+    def read(
+        self,
+        lat: float,
+        lon: float,
+        dataset: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+        min_forecast_moment: Optional[Union[datetime, str]] = None,
+        max_forecast_moment: Optional[Union[datetime, str]] = None,
+    ) -> pd.DataFrame:
+        """Read the stored forecasts for a location and selection.
+
+        :param min_forecast_moment: The first forecast moment to include.
+        :param max_forecast_moment: The last forecast moment to include.
+        """
+        directory = self.partition_path(lat, lon, dataset, columns, forecast_distances)
+        return _read_arrays(
+            directory, _parts(directory, ""), min_forecast_moment, max_forecast_moment
+        )
+
+    def append(
+        self,
+        df: pd.DataFrame,
+        lat: float,
+        lon: float,
+        dataset: Optional[str] = None,
+        columns: Optional[Iterable[str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Atomically add forecasts for a location and selection."""
+        if df.empty:
+            return
+
+        moments = pd.DatetimeIndex(df.forecast_moment)
+        order = np.lexsort((df.forecast_distance.to_numpy(), moments.asi8))
+        df = df.iloc[order]
+
+        directory = self.partition_path(lat, lon, dataset, columns, forecast_distances)
+        temporary_path = os.path.join(directory, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(temporary_path)
+
+        specs = []
+        for name, column in df.items():
+            kind, array, extra = _fixed_width(name, column)
+            np.save(os.path.join(temporary_path, f"{name}.npy"), array)
+            specs.append([name, kind, extra])
+        with open(os.path.join(temporary_path, "index.json"), "w") as f:
+            json.dump({"rows": len(df), "columns": specs}, f)
+
+        first = moments.min().strftime(_moment_format)
+        last = moments.max().strftime(_moment_format)
+        os.replace(temporary_path, os.path.join(directory, f"part-{first}-{last}"))
+
+    def forecast_history(
+        self,
+        lat: float,
+        lon: float,
+        min_forecast_moment: Optional[Union[datetime, str]] = None,
+        max_forecast_moment: Optional[Union[datetime, str]] = None,
+        forecast_distances: Optional[Iterable[int]] = None,
+        columns: Optional[Iterable[str]] = None,
+        dataset: Optional[str] = None,
+        compact: bool = False,
+        format: str = "json",
+        chunk_size: Optional[timedelta] = None,
+        max_workers: int = 4,
+        chunk_retries: int = 2,
+    ) -> pd.DataFrame:
+        """Obtain stored historical forecasts like :meth:`blueskyapi.Client.forecast_history`.
+
+        Answers from the partition synced with exactly this selection of
+        ``columns`` and ``forecast_distances`` or, if there is none, from
+        one that was synced with a larger selection, e.g. without any.
+        Returns an empty ``pandas.DataFrame`` if no forecasts for the
+        location are stored.
+
+        :param lat: Latitude for which to fetch the forecasts.
+        :param lon: Longitude for which to fetch the forecasts.
+        :param min_forecast_moment: The first forecast moment to include.
+        :param max_forecast_moment: The last forecast moment to include.
+        :param forecast_distances: Forecast distances to return data for (hours from ``forecast_moment``).
+        :param columns: Which variables to return.
+        :param dataset: Which dataset to return data from.
+        :param compact: Return smaller data types to save memory (see :func:`blueskyapi.parsing.create_dataframe`).
+        :param format: Ignored, for compatibility with :class:`blueskyapi.Client`.
+        :param chunk_size: Ignored, for compatibility with :class:`blueskyapi.Client`.
+        :param max_workers: Ignored, for compatibility with :class:`blueskyapi.Client`.
+        :param chunk_retries: Ignored, for compatibility with :class:`blueskyapi.Client`.
+        """
+        columns = _prepare_comma_separated_list(columns, "columns")
+        forecast_distances = _prepare_comma_separated_list(
+            forecast_distances, "forecast_distances"
+        )
+        selections = [
+            (columns, forecast_distances),
+            (columns, None),
+            (None, forecast_distances),
+            (None, None),
+        ]
+        for selected_columns, selected_distances in dict.fromkeys(selections):
+            directory = self.partition_path(
+                lat, lon, dataset, selected_columns, selected_distances
+            )
+            parts = _parts(directory, "")
+            if parts:
+                break
+        else:
+            return pd.DataFrame()
+
+        df = _read_arrays(
+            directory,
+            parts,
+            min_forecast_moment,
+            max_forecast_moment,
+            forecast_distances=(
+                None
+                if forecast_distances is None
+                else [int(d) for d in forecast_distances.split(",")]
+            ),
+            columns=None if columns is None else columns.split(","),
+        )
+        return _compact(df) if compact else df
+
+
+def _partition_path(
+    root: str,
+    lat: float,
+    lon: float,
+    dataset: Optional[str],
+    columns: Optional[Iterable[str]],
+    forecast_distances: Optional[Iterable[int]],
+) -> str:
+    columns = _prepare_comma_separated_list(columns, "columns")
+    forecast_distances = _prepare_comma_separated_list(
+        forecast_distances, "forecast_distances"
+    )
+    query = f"columns={columns}&forecast_distances={forecast_distances}"
+    query_hash = hashlib.sha1(query.encode()).hexdigest()[:12]
+    return os.path.join(
+        root,
+        f"dataset={dataset or 'default'}",
+        f"query={query_hash}",
+        f"lat={float(lat)}",
+        f"lon={float(lon)}",
+    )
+
+
+def _parts(directory: str, suffix: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name
+        for name in os.listdir(directory)
+        if name.startswith("part-") and name.endswith(suffix)
+    )
+
+
+def _part_moments(name: str) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    first, last = os.path.splitext(name)[0][len("part-") :].split("-")
+    return (
+        pd.Timestamp(datetime.strptime(first, _moment_format), tz="UTC"),
+        pd.Timestamp(datetime.strptime(last, _moment_format), tz="UTC"),
+    )
+
+
+def _fixed_width(name: str, column: pd.Series) -> Tuple[str, np.ndarray, Any]:
+    """How to store a column: its kind, an array of fixed width and extra information."""
+    if isinstance(column.dtype, pd.DatetimeTZDtype):
+        return "datetime", column.array.asi8, str(column.dtype.tz)
+    elif column.dtype.kind == "M":
+        return "datetime", column.to_numpy().view(np.int64), None
+    elif isinstance(column.dtype, pd.CategoricalDtype):
+        return "category", column.cat.codes.to_numpy(), list(column.cat.categories)
+    elif isinstance(column.dtype, np.dtype) and column.dtype.kind in "biuf":
+        return "array", column.to_numpy(), None
+    raise TypeError(
+        f"ArrayStore can only store numbers, booleans, datetimes and categories, "
+        f"{name} has type {column.dtype}"
+    )
+
+
+def _read_arrays(
+    directory: str,
+    parts: List[str],
+    min_forecast_moment: Optional[Union[datetime, str]],
+    max_forecast_moment: Optional[Union[datetime, str]],
+    forecast_distances: Optional[List[int]] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    start = end = None
+    if min_forecast_moment is not None:
+        start = _to_utc_timestamp(min_forecast_moment)
+    if max_forecast_moment is not None:
+        end = _to_utc_timestamp(max_forecast_moment)
+
+    frames = []
+    for part in parts:
+        first, last = _part_moments(part)
+        if (start is not None and last < start) or (end is not None and first > end):
+            continue
+        frames.append(
+            _read_part(
+                os.path.join(directory, part),
+                start,
+                end,
+                forecast_distances,
+                columns,
+            )
+        )
+
+    if not frames:
+        return pd.DataFrame()
+    return _concat(frames)
+
+
+def _read_part(
+    path: str,
+    start: Optional[pd.Timestamp],
+    end: Optional[pd.Timestamp],
+    forecast_distances: Optional[List[int]],
+    columns: Optional[List[str]],
+) -> pd.DataFrame:
+    with open(os.path.join(path, "index.json")) as f:
+        index = json.load(f)
+
+    def load(name: str) -> np.ndarray:
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+    moments = load("forecast_moment")
+    first = 0 if start is None else np.searchsorted(moments, start.value, "left")
+    last = len(moments) if end is None else np.searchsorted(moments, end.value, "right")
+    rows: Union[slice, np.ndarray] = slice(first, last)
+    if forecast_distances is not None:
+        distances = load("forecast_distance")[rows]
+        rows = first + np.flatnonzero(np.isin(distances, forecast_distances))
+
+    specs: Dict[str, Tuple[str, Any]] = {
+        name: (kind, extra) for name, kind, extra in index["columns"]
+    }
+    if columns is None:
+        names = list(specs)
+    else:
+        missing = [name for name in columns if name not in specs]
+        if missing:
+            raise KeyError(f"Columns {missing} are not stored in {path}")
+        names = [
+            name
+            for name in specs
+            if name in ("forecast_moment", "forecast_distance") or name in columns
+        ]
+
+    data = {}
+    for name in names:
+        kind, extra = specs[name]
+        # Copies only the selected rows out of the memory-mapped file.
+        array = np.array(load(name)[rows])
+        if kind == "datetime":
+            values = pd.DatetimeIndex(array.view("M8[ns]"))
+            data[name] = values if extra is None else values.tz_localize(extra)
+        elif kind == "category":
+            data[name] = pd.Categorical.from_codes(array, extra)
+        else:
+            data[name] = array
+    return pd.DataFrame(data, copy=False)
+
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the columns like :func:`blueskyapi.parsing.create_dataframe` with ``compact``."""
+    types = {}
+    for name, column in df.items():
+        kind = column.dtype.kind if isinstance(column.dtype, np.dtype) else None
+        if name == "forecast_distance":
+            types[name] = np.int16
+        elif name in ("lat", "lon") or kind not in ("f", "i"):
+            continue
+        elif kind == "f":
+            is_category = name.startswith("categorical_")
+            if is_category and _is_integral(column.to_numpy()):
+                types[name] = np.int8
+            else:
+                types[name] = np.float32
+        else:
+            types[name] = _smallest_int_type(column.to_numpy())
+    return df.astype(types)
+
+
+def sync_forecast_history(
+    client: Client,
+    store: Union[ParquetStore, ArrayStore],
+    lat: float,
+    lon: float,
+    min_forecast_moment: Union[datetime, str],
+    forecast_distances: Optional[Iterable[int]] = None,
+    columns: Optional[Iterable[str]] = None,
+    dataset: Optional[str] = None,
+    chunk_size: Optional[timedelta] = None,
+) -> int:
+    """Download the forecasts missing in the store and add them to it.
+
+    Fetches the forecasts after the latest stored ``forecast_moment``,
+    or starting at ``min_forecast_moment`` if nothing is stored yet.
+    Forecast runs from the last day may still be updated by the API,
+    so they are left for a later sync. Returns the number of added
+    rows.
+
+    :param client: The client used to fetch the forecasts.
+    :param store: Where to store the forecasts.
+    :param lat: Latitude for which to fetch the forecasts.
+    :param lon: Longitude for which to fetch the forecasts.
+    :param min_forecast_moment: The first forecast moment to store.
+    :param forecast_distances: Forecast distances to return data for (hours from ``forecast_moment``).
+    :param columns: Which variables to fetch (see `this page for available variables <https://blueskyapi.io/docs/data>`_).
+    :param dataset: Which dataset to fetch data from (only for users on the Professional plan).
+    :param chunk_size: Passed on to :meth:`Client.forecast_history` to split long downloads.
+    """
+    selection = dict(
+        dataset=dataset, columns=columns, forecast_distances=forecast_distances
+    )
+    start = _to_utc_timestamp(min_forecast_moment)
+    latest = store.latest_forecast_moment(lat, lon, **selection)
+    if latest is not None and latest >= start:
+        start = latest + timedelta(seconds=1)
+    end = _history_settled_before() - timedelta(seconds=1)
+    if start > end:
+        return 0
+
+    df = client.forecast_history(
+        lat,
+        lon,
+        min_forecast_moment=start.isoformat(),
+        max_forecast_moment=end.isoformat(),
+        forecast_distances=forecast_distances,
+        columns=columns,
+        dataset=dataset,
+        chunk_size=chunk_size,
+    )
+    if latest is not None and "forecast_moment" in df:
+        df = df[df.forecast_moment > latest]
+
+    store.append(df, lat, lon, **selection)
+    return len(df)
@@ -0,0 +1,132 @@
+"""
+Helpers to reshape the results of :meth:`blueskyapi.Client.latest_forecast`,
+:meth:`blueskyapi.Client.forecast_history` and their ``_many``
+variants. They work on whole arrays at once, so they stay fast for
+millions of rows::
+
+    import blueskyapi
+    from blueskyapi import transforms
+
+    client = blueskyapi.Client()
+    df = client.forecast_history(52.5, 13.5, min_forecast_moment="2021-12-01")
+
+    # The most recent forecast for every hour, as a time series
+    latest = transforms.latest_per_valid_time(df)
+    series = latest.set_index("valid_time").temperature_at_2m
+
+    # One row per valid time, one column per forecast distance
+    table = transforms.pivot(transforms.add_valid_time(df), "temperature_at_2m")
+"""
+
+from typing import Sequence
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+
+Keys = Union[str, Sequence[str]]
+
+
+def valid_time(df: pd.DataFrame) -> pd.DatetimeIndex:
+    """The moment each forecast is for: ``forecast_moment`` plus ``forecast_distance`` hours."""
+    hours = df.forecast_distance.to_numpy().astype("timedelta64[h]")
+    return pd.DatetimeIndex(df.forecast_moment) + hours
+
+
+def add_valid_time(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of ``df`` with a ``valid_time`` column after ``forecast_distance``."""
+    result = df.copy()
+    result.insert(
+        result.columns.get_loc("forecast_distance") + 1, "valid_time", valid_time(df)
+    )
+    return result
+
+
+def latest_per_valid_time(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep only the most recent forecast for each valid time.
+
+    For every ``valid_time`` (and location, if there are ``lat`` and
+    ``lon`` columns), selects the row with the latest
+    ``forecast_moment``, i.e. the shortest forecast distance. Adds a
+    ``valid_time`` column if there is none and keeps the order of the
+    rows.
+    """
+    if "valid_time" not in df:
+        df = add_valid_time(df)
+
+    keys = [df[name] for name in ("lat", "lon") if name in df] + [df.valid_time]
+    groups = _factorize(keys)[0]
+    moments = pd.DatetimeIndex(df.forecast_moment).asi8
+
+    # Sort by group and then forecast moment, so each group ends with its latest row.
+    order = np.lexsort((moments, groups))
+    sorted_groups = groups[order]
+    is_last = np.append(sorted_groups[1:] != sorted_groups[:-1], True)
+    rows = np.sort(order[is_last]) if len(order) else order
+    return df.iloc[rows].reset_index(drop=True)
+
+
+def pivot(
+    df: pd.DataFrame,
+    values: str,
+    index: Keys = "valid_time",
+    columns: Keys = "forecast_distance",
+) -> pd.DataFrame:
+    """Arrange one variable in a table, e.g. valid times by forecast distance.
+
+    Rows and columns are sorted, missing combinations are ``NaN`` and
+    for repeated combinations the last row wins. Use
+    ``pivot(...).to_numpy()`` to get a plain array. For results of
+    several locations, ``index=["lat", "lon"]`` and
+    ``columns="valid_time"`` gives one row per location::
+
+        table = transforms.pivot(
+            transforms.latest_per_valid_time(df),
+            "temperature_at_2m",
+            index=["lat", "lon"],
+            columns="valid_time",
+        )
+
+    :param df: Forecasts, with a ``valid_time`` column if it's used (see :func:`add_valid_time`).
+    :param values: The column to fill the table with.
+    :param index: Column(s) whose values become the rows.
+    :param columns: Column(s) whose values become the columns.
+    """
+    row_codes, row_labels = _factorize(_columns(df, index))
+    column_codes, column_labels = _factorize(_columns(df, columns))
+
+    data = df[values].to_numpy()
+    numeric = data.dtype.kind in "biuf"
+    table = np.full(
+        (len(row_labels), len(column_labels)),
+        np.nan,
+        dtype=np.float64 if numeric else object,
+    )
+    table[row_codes, column_codes] = data
+    return pd.DataFrame(table, index=row_labels, columns=column_labels)
+
+
+def _columns(df: pd.DataFrame, names: Keys) -> list:
+    if isinstance(names, str):
+        names = [names]
+    return [df[name] for name in names]
+
+
+def _factorize(keys: list) -> tuple:
+    """Number the distinct combinations of ``keys`` in sorted order."""
+    if len(keys) == 1:
+        codes, labels = pd.factorize(keys[0], sort=True)
+        return codes, pd.Index(labels, name=keys[0].name)
+
+    factorized = [pd.factorize(key, sort=True) for key in keys]
+    combined = np.ravel_multi_index(
+        [codes for codes, _ in factorized], [len(labels) for _, labels in factorized]
+    )
+    unique, codes = np.unique(combined, return_inverse=True)
+    levels = np.unravel_index(unique, [len(labels) for _, labels in factorized])
+    labels = pd.MultiIndex.from_arrays(
+        [labels.take(level) for (_, labels), level in zip(factorized, levels)],
+        names=[key.name for key in keys],
+    )
+    return codes, labels
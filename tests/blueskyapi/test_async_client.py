@@ -0,0 +1,171 @@
+import asyncio
+from datetime import datetime
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+import responses
+
+import blueskyapi
+
+
+default_result = [{"forecast_moment": "2021-12-27T18:00:00Z", "some_column": 5}]
+
+
+def add_api_response(path, *, result=default_result, status=200):
+    responses.add(
+        responses.GET,
+        blueskyapi.default_config.base_url + path,
+        json=result,
+        status=status,
+    )
+
+
+def run(coroutine_function):
+    async def main():
+        async with blueskyapi.AsyncClient() as client:
+            return await coroutine_function(client)
+
+    return asyncio.run(main())
+
+
+def describe_init():
+    def test_defaults(mocker):
+        mocker.patch.multiple(
+            "blueskyapi.default_config",
+            base_url="the base url",
+            api_key="the api key",
+        )
+
+        client = blueskyapi.AsyncClient()
+        assert client.base_url == "the base url"
+        assert client.api_key == "the api key"
+        assert client.max_concurrency == 10
+        client.close()
+
+    def test_with_args():
+        client = blueskyapi.AsyncClient(
+            "api-key", base_url="https://example.com/api", max_concurrency=3
+        )
+        assert client.base_url == "https://example.com/api"
+        assert client.api_key == "api-key"
+        assert client.max_concurrency == 3
+        client.close()
+
+    def test_connection_pool():
+        client = blueskyapi.AsyncClient(max_concurrency=3, timeout=5)
+        adapter = client.client.session.get_adapter("https://example.com")
+        assert adapter._pool_maxsize == 3
+        assert client.client.timeout == 5
+        client.close()
+
+    def with_invalid_max_concurrency():
+        with pytest.raises(ValueError, match="max_concurrency should be"):
+            blueskyapi.AsyncClient(max_concurrency=0)
+
+
+def describe_latest_forecast():
+    @responses.activate
+    def test_result():
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5&columns=some_column")
+        result = run(
+            lambda client: client.latest_forecast(53.5, 13.5, columns=["some_column"])
+        )
+
+        expected = blueskyapi.Client().latest_forecast(
+            53.5, 13.5, columns=["some_column"]
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    @responses.activate
+    def test_over_rate_limit():
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5",
+            result={"the": "error"},
+            status=429,
+        )
+        with pytest.raises(blueskyapi.errors.OverRateLimit, match="429"):
+            run(lambda client: client.latest_forecast(53.5, 13.5))
+
+
+def describe_forecast_history():
+    @responses.activate
+    def test_result():
+        add_api_response(
+            "/forecasts/history"
+            "?lat=53.5&lon=13.5"
+            "&min_forecast_moment=2021-12-27T18:00:00"
+            "&max_forecast_moment=2021-12-28T00:00:00"
+        )
+        result = run(
+            lambda client: client.forecast_history(
+                53.5,
+                13.5,
+                min_forecast_moment="2021-12-27T18:00:00",
+                max_forecast_moment="2021-12-28T00:00:00",
+            )
+        )
+        assert list(result.some_column) == [5]
+
+
+def describe_iter_forecast_history():
+    @responses.activate
+    def test_yields_chunks():
+        for moment, max_moment in [
+            ("2021-12-27T00:00:00", "2021-12-27T11:59:59"),
+            ("2021-12-27T12:00:00", "2021-12-27T12:00:00"),
+        ]:
+            add_api_response(
+                "/forecasts/history?lat=53.5&lon=13.5"
+                f"&min_forecast_moment={moment}%2B00:00"
+                f"&max_forecast_moment={max_moment}%2B00:00",
+                result=[{"forecast_moment": f"{moment}Z"}],
+            )
+
+        async def collect(client):
+            return [
+                chunk
+                async for chunk in client.iter_forecast_history(
+                    53.5,
+                    13.5,
+                    min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                    max_forecast_moment=datetime(2021, 12, 27, 12, 0),
+                    chunk_size=timedelta(hours=12),
+                )
+            ]
+
+        chunks = run(collect)
+        assert [len(chunk) for chunk in chunks] == [1, 1]
+
+
+def describe_gather():
+    @responses.activate
+    def test_results_in_order():
+        for lat in [50, 51, 52]:
+            add_api_response(
+                f"/forecasts/latest?lat={lat}&lon=13.5",
+                result=[{"forecast_moment": "2021-12-27T18:00:00Z", "lat": lat}],
+            )
+
+        results = run(
+            lambda client: client.gather(
+                client.latest_forecast(lat, 13.5) for lat in [50, 51, 52]
+            )
+        )
+        assert [result.lat[0] for result in results] == [50, 51, 52]
+
+    @responses.activate
+    def with_return_exceptions():
+        add_api_response("/forecasts/latest?lat=50&lon=13.5")
+        add_api_response(
+            "/forecasts/latest?lat=51&lon=13.5", result={"the": "error"}, status=429
+        )
+
+        results = run(
+            lambda client: client.gather(
+                [client.latest_forecast(50, 13.5), client.latest_forecast(51, 13.5)],
+                return_exceptions=True,
+            )
+        )
+        assert isinstance(results[0], pd.DataFrame)
+        assert isinstance(results[1], blueskyapi.errors.OverRateLimit)
@@ -0,0 +1,123 @@
+import pandas as pd
+import pytest
+
+from blueskyapi.cache import DataFrameCache
+from blueskyapi.cache import SQLiteCache
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), ttl=60, max_entries=2)
+    yield cache
+    cache.close()
+
+
+def describe_sqlite_cache():
+    def test_get_and_set(cache):
+        assert cache.get("key") is None
+        cache.set("key", b"value", ttl=60)
+        assert cache.get("key") == b"value"
+
+    def test_persists(tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        SQLiteCache(path).set("key", "value", ttl=60)
+        assert SQLiteCache(path).get("key") == "value"
+
+    def test_expiry(cache, mocker):
+        time = mocker.patch("time.time", return_value=1000)
+        cache.set("key", b"value", ttl=60)
+
+        time.return_value = 1059
+        assert cache.get("key") == b"value"
+
+        time.return_value = 1060
+        assert cache.get("key") is None
+
+    def test_without_ttl(cache, mocker):
+        time = mocker.patch("time.time", return_value=1000)
+        cache.set("key", b"value", ttl=None)
+
+        time.return_value = 10**10
+        assert cache.get("key") == b"value"
+
+    def test_evicts_least_recently_used(cache, mocker):
+        time = mocker.patch("time.time", return_value=1000)
+        cache.set("a", b"a", ttl=60)
+        time.return_value = 1001
+        cache.set("b", b"b", ttl=60)
+        time.return_value = 1002
+        cache.get("a")
+        time.return_value = 1003
+        cache.set("c", b"c", ttl=60)
+
+        assert cache.get("a") == b"a"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"c"
+
+    def test_clear(cache):
+        cache.set("key", b"value", ttl=60)
+        cache.clear()
+        assert cache.get("key") is None
+
+
+def describe_dataframe_cache():
+    @pytest.fixture()
+    def df():
+        return pd.DataFrame({"a": [1.0, 2.0, 3.0]})
+
+    def test_get_and_set(df):
+        cache = DataFrameCache()
+        assert cache.get("key") is None
+        cache.set("key", df, ttl=60)
+        pd.testing.assert_frame_equal(cache.get("key"), df)
+
+    def test_returns_copies(df):
+        cache = DataFrameCache()
+        cache.set("key", df, ttl=60)
+        df.a = 0
+        cache.get("key").a = 0
+        assert list(cache.get("key").a) == [1.0, 2.0, 3.0]
+
+    def test_expiry(df, mocker):
+        time = mocker.patch("time.time", return_value=1000)
+        cache = DataFrameCache()
+        cache.set("key", df, ttl=60)
+
+        time.return_value = 1060
+        assert cache.get("key") is None
+        assert len(cache) == 0
+        assert cache.nbytes == 0
+
+    def test_evicts_by_entries(df):
+        cache = DataFrameCache(max_entries=2)
+        cache.set("a", df, ttl=60)
+        cache.set("b", df, ttl=60)
+        cache.get("a")
+        cache.set("c", df, ttl=60)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_evicts_by_bytes(df):
+        nbytes = int(df.memory_usage(deep=True).sum())
+        cache = DataFrameCache(max_bytes=2 * nbytes)
+        cache.set("a", df, ttl=60)
+        cache.set("b", df, ttl=60)
+        cache.set("c", df, ttl=60)
+
+        assert len(cache) == 2
+        assert cache.nbytes == 2 * nbytes
+        assert cache.get("a") is None
+
+    def test_skips_too_large(df):
+        cache = DataFrameCache(max_bytes=1)
+        cache.set("a", df, ttl=60)
+        assert len(cache) == 0
+
+    def test_clear(df):
+        cache = DataFrameCache()
+        cache.set("key", df, ttl=60)
+        cache.clear()
+        assert cache.get("key") is None
+        assert cache.nbytes == 0
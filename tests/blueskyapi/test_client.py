@@ -1,11 +1,28 @@
+import gzip
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from datetime import timedelta
 
 import numpy as np
 import pandas as pd
 import pytest
+import requests
 import responses
 
 import blueskyapi
+from blueskyapi import parsing
+from blueskyapi.cache import DataFrameCache
+from blueskyapi.cache import SQLiteCache
+from blueskyapi.client import _Validated
+from blueskyapi.client import _ValidatedResponses
+from blueskyapi.instrumentation import Observer
+from blueskyapi.ratelimit import ConcurrencyLimiter
+from blueskyapi.ratelimit import RateLimiter
 
 
 @pytest.fixture()
@@ -32,6 +49,20 @@ def add_api_response(path, *, result=default_result, status=200, api_key=None):
     )
 
 
+def add_chunk_response(min_moment, max_moment, result=None, status=200):
+    add_api_response(
+        "/forecasts/history?lat=53.5&lon=13.5"
+        f"&min_forecast_moment={min_moment}%2B00:00"
+        f"&max_forecast_moment={max_moment}%2B00:00",
+        result=result
+        or [
+            {"forecast_moment": f"{min_moment}Z", "forecast_distance": 0},
+            {"forecast_moment": f"{min_moment}Z", "forecast_distance": 3},
+        ],
+        status=status,
+    )
+
+
 def describe_init():
     def test_defaults(mocker):
         mocker.patch.multiple(
@@ -49,6 +80,715 @@ def describe_init():
         assert client.base_url == "https://example.com/api"
         assert client.api_key == "api-key"
 
+    def test_connection_pool():
+        client = blueskyapi.Client(pool_connections=2, pool_maxsize=20)
+        adapter = client.session.get_adapter("https://example.com")
+        assert adapter._pool_connections == 2
+        assert adapter._pool_maxsize == 20
+        assert adapter._pool_block
+
+    def without_keep_alive():
+        client = blueskyapi.Client(keep_alive=False)
+        assert client.session.headers["Connection"] == "close"
+
+    @responses.activate
+    def with_timeout(mocker):
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        client = blueskyapi.Client(timeout=(3, 30))
+        get = mocker.spy(client.session, "get")
+        client.latest_forecast(53.5, 13.5)
+        assert get.call_args.kwargs["timeout"] == (3, 30)
+
+    def test_context_manager(mocker):
+        with blueskyapi.Client() as client:
+            close = mocker.spy(client.session, "close")
+        close.assert_called_once()
+
+    def describe_accept_encoding():
+        def without_brotli(mocker):
+            mocker.patch("importlib.util.find_spec", return_value=None)
+            client = blueskyapi.Client()
+            assert client.session.headers["Accept-Encoding"] == "gzip, deflate"
+
+        def with_brotli(mocker):
+            mocker.patch(
+                "importlib.util.find_spec", side_effect=lambda name: name == "brotli"
+            )
+            client = blueskyapi.Client()
+            assert client.session.headers["Accept-Encoding"] == "gzip, deflate, br"
+
+
+def describe_grid_resolution():
+    @pytest.fixture()
+    def client():
+        return blueskyapi.Client(grid_resolution=0.25)
+
+    def with_invalid_resolution():
+        with pytest.raises(ValueError, match="grid_resolution should be positive"):
+            blueskyapi.Client(grid_resolution=0)
+
+    @responses.activate
+    def test_snaps_coordinates(client):
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        client.latest_forecast(53.61, 13.39)
+
+    @responses.activate
+    def with_forecast_history(client):
+        add_api_response(
+            "/forecasts/history?lat=-0.25&lon=180.0"
+            "&min_forecast_moment=2021-12-27T00:00:00"
+        )
+        client.forecast_history(-0.3, 179.9, min_forecast_moment="2021-12-27T00:00:00")
+
+    @responses.activate
+    def test_fetches_each_cell_once(client):
+        for lat in [50.0, 53.5]:
+            add_api_response(
+                f"/forecasts/latest?lat={lat}&lon=13.5",
+                result=[
+                    {"forecast_moment": "2021-12-27T18:00:00Z", "some_column": lat},
+                    {"forecast_moment": "2021-12-28T00:00:00Z", "some_column": lat},
+                ],
+            )
+
+        result = client.latest_forecast_many(
+            [(53.61, 13.39), (50, 13.5), (53.55, 13.45)]
+        )
+
+        assert len(responses.calls) == 2
+        assert list(result.columns) == ["lat", "lon", "forecast_moment", "some_column"]
+        assert list(result.lat) == [53.61, 53.61, 50, 50, 53.55, 53.55]
+        assert list(result.lon) == [13.39, 13.39, 13.5, 13.5, 13.45, 13.45]
+        assert list(result.some_column) == [53.5, 53.5, 50, 50, 53.5, 53.5]
+
+    @responses.activate
+    def without_resolution():
+        add_api_response("/forecasts/latest?lat=53.61&lon=13.39")
+        result = blueskyapi.Client().latest_forecast_many(
+            [(53.61, 13.39), (53.61, 13.39)]
+        )
+        assert len(responses.calls) == 1
+        assert list(result.lat) == [53.61, 53.61]
+
+
+def describe_lazy_pandas():
+    def test_import_does_not_import_pandas():
+        code = "import sys, blueskyapi; print('pandas' in sys.modules)"
+        output = subprocess.check_output([sys.executable, "-c", code])
+        assert output.strip() == b"False"
+
+    def test_raw_does_not_import_pandas(stand_in_server):
+        code = (
+            "import sys, blueskyapi\n"
+            f"client = blueskyapi.Client(base_url={stand_in_server.url!r})\n"
+            "records = client.latest_forecast(53.5, 13.5, raw=True)\n"
+            "print(len(records), 'pandas' in sys.modules)"
+        )
+        output = subprocess.check_output([sys.executable, "-c", code])
+        assert output.strip() == b"2 False"
+
+    def test_user_agent_has_pandas_version():
+        assert f"pandas/{pd.__version__}" in blueskyapi.Client()._user_agent()
+
+
+def describe_get():
+    @responses.activate
+    def test_returns_bytes(client):
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        response = client._get("/forecasts/latest", dict(lat=53.5, lon=13.5))
+        assert response == responses.calls[0].response.content
+
+    @responses.activate
+    def with_gzip(client):
+        body = gzip.compress(json.dumps(default_result).encode())
+        responses.add(
+            responses.GET,
+            blueskyapi.default_config.base_url + "/forecasts/latest",
+            body=body,
+            headers={"Content-Encoding": "gzip"},
+        )
+        result = client.latest_forecast(53.5, 13.5)
+        assert len(result) == 1
+        assert "gzip" in responses.calls[0].request.headers["Accept-Encoding"]
+
+
+def describe_format():
+    @pytest.fixture()
+    def client(stand_in_server):
+        pytest.importorskip("pyarrow")
+        return blueskyapi.Client(base_url=stand_in_server.url)
+
+    @pytest.mark.parametrize("format", ["arrow", "parquet"])
+    def test_requests_format(client, stand_in_server, format):
+        result = client.latest_forecast(53.5, 13.5, format=format)
+        expected = client.latest_forecast(53.5, 13.5)
+
+        assert (
+            f"application/vnd.apache.{format}" in stand_in_server.requests[0]["Accept"]
+        )
+        assert "application/json" in stand_in_server.requests[0]["Accept"]
+        pd.testing.assert_frame_equal(result, expected)
+
+    def with_unsupported_format(client, stand_in_server):
+        stand_in_server.formats = []
+        result = client.forecast_history(53.5, 13.5, format="arrow")
+        assert list(result.forecast_distance) == [0, 6]
+
+    def with_many(client, stand_in_server):
+        result = client.latest_forecast_many([(50, 13.5), (51, 13.5)], format="arrow")
+        assert list(result.lat) == [50, 50, 51, 51]
+        assert all("arrow" in request["Accept"] for request in stand_in_server.requests)
+
+    def with_cache(client, stand_in_server):
+        client.cache = SQLiteCache(":memory:")
+        client.latest_forecast(53.5, 13.5, format="arrow")
+        client.latest_forecast(53.5, 13.5)
+        client.latest_forecast(53.5, 13.5, format="arrow")
+        assert len(stand_in_server.requests) == 2
+
+    def without_pyarrow(client, stand_in_server, mocker):
+        mocker.patch("importlib.util.find_spec", return_value=None)
+        client.latest_forecast(53.5, 13.5, format="arrow")
+        assert stand_in_server.requests[0]["Accept"] == "*/*"
+
+    def with_invalid_format(client):
+        with pytest.raises(ValueError, match="format should be one of"):
+            client.latest_forecast(53.5, 13.5, format="xml")
+
+
+def describe_with_cache():
+    @pytest.fixture()
+    def client(tmp_path):
+        return blueskyapi.Client(cache=SQLiteCache(str(tmp_path / "cache.sqlite")))
+
+    @responses.activate
+    def test_reuses_responses(client):
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5&columns=col_a,col_b")
+        client.latest_forecast(53.5, 13.5, columns=["col_a", "col_b"])
+        client.latest_forecast(53.5, 13.5, columns="col_a,col_b")
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_keys_on_params(client):
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        add_api_response("/forecasts/latest?lat=52.5&lon=13.5")
+        client.latest_forecast(53.5, 13.5)
+        client.latest_forecast(52.5, 13.5)
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_does_not_cache_errors(client):
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5", result={"the": "error"}, status=429
+        )
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        with pytest.raises(blueskyapi.errors.OverRateLimit):
+            client.latest_forecast(53.5, 13.5)
+        client.latest_forecast(53.5, 13.5)
+        client.latest_forecast(53.5, 13.5)
+        assert len(responses.calls) == 2
+
+    def describe_ttl():
+        @pytest.fixture()
+        def cache(client, mocker):
+            return mocker.spy(client.cache, "set")
+
+        @responses.activate
+        def with_latest_forecast(client, cache):
+            add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+            client.latest_forecast(53.5, 13.5)
+            assert cache.call_args.args[2] == client.cache.ttl
+
+        @responses.activate
+        def with_settled_history(client, cache):
+            add_api_response(
+                "/forecasts/history"
+                "?lat=53.5&lon=13.5&max_forecast_moment=2021-12-28T00:00:00"
+            )
+            client.forecast_history(
+                53.5, 13.5, max_forecast_moment=datetime(2021, 12, 28, 0, 0)
+            )
+            assert cache.call_args.args[2] is None
+
+        @responses.activate
+        def with_recent_history(client, cache):
+            moment = datetime.utcnow().isoformat() + "Z"
+            add_api_response(
+                f"/forecasts/history?lat=53.5&lon=13.5&max_forecast_moment={moment}"
+            )
+            client.forecast_history(53.5, 13.5, max_forecast_moment=moment)
+            assert cache.call_args.args[2] == client.cache.ttl
+
+        @responses.activate
+        def with_open_ended_history(client, cache):
+            add_api_response("/forecasts/history?lat=53.5&lon=13.5")
+            client.forecast_history(53.5, 13.5)
+            assert cache.call_args.args[2] == client.cache.ttl
+
+
+def add_validated_response(path, *, result=default_result, validators):
+    requests_headers = []
+
+    def callback(request):
+        requests_headers.append(request.headers)
+        conditions = {"If-None-Match": "ETag", "If-Modified-Since": "Last-Modified"}
+        for condition, validator in conditions.items():
+            value = request.headers.get(condition)
+            if value is not None and value == validators.get(validator):
+                return 304, validators, ""
+        return 200, validators, json.dumps(result)
+
+    responses.add_callback(
+        responses.GET, blueskyapi.default_config.base_url + path, callback=callback
+    )
+    return requests_headers
+
+
+def describe_conditional_requests():
+    @responses.activate
+    def with_etag(client, mocker):
+        headers = add_validated_response(
+            "/forecasts/latest",
+            result=[{"forecast_moment": "2021-12-27T18:00:00Z", "some_column": 5}],
+            validators={"ETag": '"v1"'},
+        )
+        parse = mocker.spy(parsing, "create_dataframe")
+
+        first = client.latest_forecast(53.5, 13.5)
+        first.some_column = 0
+        second = client.latest_forecast(53.5, 13.5)
+
+        assert "If-None-Match" not in headers[0]
+        assert headers[1]["If-None-Match"] == '"v1"'
+        assert responses.calls[1].response.status_code == 304
+        assert list(second.some_column) == [5]
+        assert parse.call_count == 1
+
+    @responses.activate
+    def with_last_modified(client):
+        last_modified = "Mon, 27 Dec 2021 18:00:00 GMT"
+        headers = add_validated_response(
+            "/forecasts/latest", validators={"Last-Modified": last_modified}
+        )
+        client.latest_forecast(53.5, 13.5, raw=True)
+        result = client.latest_forecast(53.5, 13.5, raw=True)
+
+        assert headers[1]["If-Modified-Since"] == last_modified
+        assert result == default_result
+
+    @responses.activate
+    def without_validators(client):
+        headers = add_validated_response("/forecasts/latest", validators={})
+        client.latest_forecast(53.5, 13.5)
+        client.latest_forecast(53.5, 13.5)
+        assert "If-None-Match" not in headers[1]
+        assert "If-Modified-Since" not in headers[1]
+
+    @responses.activate
+    def with_changed_response(client):
+        validators = {"ETag": '"v1"'}
+        result = [{"a": 1}]
+        add_validated_response(
+            "/forecasts/latest", result=result, validators=validators
+        )
+        client.latest_forecast(53.5, 13.5)
+
+        validators["ETag"] = '"v2"'
+        result[0]["a"] = 2
+        assert list(client.latest_forecast(53.5, 13.5).a) == [2]
+        assert list(client.latest_forecast(53.5, 13.5, compact=True).a) == [2]
+
+    @responses.activate
+    def with_forecast_history(client):
+        headers = add_validated_response(
+            "/forecasts/history", validators={"ETag": '"v1"'}
+        )
+        client.forecast_history(53.5, 13.5)
+        client.forecast_history(53.5, 13.5)
+        assert "If-None-Match" not in headers[1]
+        assert client._validated._nbytes == 0
+
+    @pytest.mark.parametrize("revalidation_bytes", [None, 0])
+    @responses.activate
+    def without_revalidation(revalidation_bytes):
+        client = blueskyapi.Client(revalidation_bytes=revalidation_bytes)
+        headers = add_validated_response(
+            "/forecasts/latest", validators={"ETag": '"v1"'}
+        )
+        client.latest_forecast(53.5, 13.5)
+        client.latest_forecast(53.5, 13.5)
+        assert "If-None-Match" not in headers[1]
+        assert client._validated is None
+
+    def test_keeps_bounded_memory():
+        validated = _ValidatedResponses(max_bytes=10)
+        validated.set("a", _Validated('"a"', None, b"123456", nbytes=6))
+        validated.set("b", _Validated('"b"', None, b"123456", nbytes=6))
+        assert validated.get("a") is None
+        assert validated.get("b").etag == '"b"'
+
+
+def describe_has_new_forecast():
+    @pytest.fixture(autouse=True)
+    def latest_forecast_moment():
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5&forecast_distances=0",
+            result=[{"forecast_moment": "2021-12-27T18:00:00Z", "some_column": 5}],
+        )
+
+    @responses.activate
+    def test_latest_forecast_moment(client):
+        moment = client.latest_forecast_moment(53.5, 13.5)
+        assert moment == pd.Timestamp("2021-12-27T18:00:00Z")
+
+    @responses.activate
+    def with_older_moment(client):
+        assert client.has_new_forecast(53.5, 13.5, since="2021-12-27T12:00:00Z")
+
+    @responses.activate
+    def with_same_moment(client):
+        assert not client.has_new_forecast(53.5, 13.5, since=datetime(2021, 12, 27, 18))
+
+    @responses.activate
+    def without_moment(client):
+        assert client.has_new_forecast(53.5, 13.5, since=None)
+
+    @responses.activate
+    def without_forecast(client):
+        responses.replace(
+            responses.GET,
+            blueskyapi.default_config.base_url
+            + "/forecasts/latest?lat=53.5&lon=13.5&forecast_distances=0",
+            json=[],
+        )
+        assert client.latest_forecast_moment(53.5, 13.5) is None
+        assert not client.has_new_forecast(53.5, 13.5, since=None)
+
+
+def describe_with_dataframe_cache():
+    @pytest.fixture()
+    def client():
+        return blueskyapi.Client(dataframe_cache=DataFrameCache())
+
+    @responses.activate
+    def test_reuses_dataframes(client):
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5",
+            result=[{"forecast_moment": "2021-12-27T18:00:00Z", "some_column": 5}],
+        )
+        first = client.latest_forecast(53.5, 13.5)
+        first.some_column = 0
+        second = client.latest_forecast(53.5, 13.5)
+
+        assert len(responses.calls) == 1
+        assert list(second.some_column) == [5]
+
+    @responses.activate
+    def test_keys_on_params(client):
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        add_api_response("/forecasts/history?lat=53.5&lon=13.5")
+        client.latest_forecast(53.5, 13.5)
+        client.forecast_history(53.5, 13.5)
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_keys_on_compact(client):
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5",
+            result=[{"forecast_moment": "2021-12-27T18:00:00Z", "some_column": 5.5}],
+        )
+        full = client.latest_forecast(53.5, 13.5)
+        compact = client.latest_forecast(53.5, 13.5, compact=True)
+        assert str(full.some_column.dtype) == "float64"
+        assert str(compact.some_column.dtype) == "float32"
+
+
+def add_slow_api_response(path, *, result=default_result, status=200):
+    def callback(request):
+        time.sleep(0.2)
+        return status, {}, json.dumps(result)
+
+    responses.add_callback(
+        responses.GET, blueskyapi.default_config.base_url + path, callback=callback
+    )
+
+
+def call_concurrently(function, times):
+    barrier = threading.Barrier(times)
+
+    def call(_):
+        barrier.wait()
+        return function()
+
+    with ThreadPoolExecutor(max_workers=times) as executor:
+        return [
+            future.exception() or future.result()
+            for future in [executor.submit(call, i) for i in range(times)]
+        ]
+
+
+def describe_concurrent_requests():
+    @responses.activate
+    def test_share_one_request(client):
+        add_slow_api_response(
+            "/forecasts/latest",
+            result=[{"forecast_moment": "2021-12-27T18:00:00Z", "some_column": 5}],
+        )
+        results = call_concurrently(
+            lambda: client.latest_forecast(53.5, 13.5, columns=["some_column"]), 5
+        )
+
+        assert len(responses.calls) == 1
+        for result in results:
+            pd.testing.assert_frame_equal(result, results[0])
+        assert len({id(result) for result in results}) == 5
+
+    @responses.activate
+    def test_first_caller_gets_a_copy(client, mocker):
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5",
+            result=[
+                {"forecast_moment": "2021-12-27T18:00:00Z", "forecast_distance": 0},
+                {"forecast_moment": "2021-12-27T18:00:00Z", "forecast_distance": 6},
+            ],
+        )
+        do = mocker.spy(client._dataframes_in_flight, "do")
+
+        result = client.latest_forecast(53.5, 13.5)
+        result["forecast_distance"] *= 100
+
+        # What callers waiting for the same request get a copy of
+        shared, _ = do.spy_return
+        assert list(shared.forecast_distance) == [0, 6]
+
+    @responses.activate
+    def test_share_errors(client):
+        add_slow_api_response("/forecasts/latest", result={"the": "error"}, status=400)
+        results = call_concurrently(lambda: client.latest_forecast(53.5, 13.5), 3)
+
+        assert len(responses.calls) == 1
+        assert all(isinstance(r, blueskyapi.errors.RequestError) for r in results)
+
+    @responses.activate
+    def test_keys_on_params(client):
+        add_slow_api_response("/forecasts/latest")
+        points = iter([(53.5, 13.5), (53.5, 14.5)])
+        call_concurrently(lambda: client.latest_forecast(*next(points)), 2)
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_later_requests_are_sent(client):
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        client.latest_forecast(53.5, 13.5)
+        client.latest_forecast(53.5, 13.5)
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def with_many(client):
+        add_slow_api_response("/forecasts/latest")
+        call_concurrently(
+            lambda: client.latest_forecast_many([(53.5, 13.5), (53.5, 13.5)]), 3
+        )
+        assert len(responses.calls) == 1
+
+
+def describe_with_rate_limiter():
+    @pytest.fixture()
+    def client():
+        return blueskyapi.Client(rate_limiter=RateLimiter(retries=2))
+
+    @pytest.fixture(autouse=True)
+    def sleep(mocker):
+        return mocker.patch("time.sleep")
+
+    @responses.activate
+    def test_retries(client, sleep):
+        responses.add(
+            responses.GET,
+            blueskyapi.default_config.base_url + "/forecasts/latest",
+            json={"the": "error"},
+            status=429,
+            headers={"Retry-After": "3"},
+        )
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+
+        client.latest_forecast(53.5, 13.5)
+        assert len(responses.calls) == 2
+        sleep.assert_any_call(3)
+
+    @responses.activate
+    def test_gives_up(client):
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5", result={"the": "error"}, status=503
+        )
+        with pytest.raises(blueskyapi.errors.RequestError, match="503"):
+            client.latest_forecast(53.5, 13.5)
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_retries_connection_errors(client):
+        responses.add(
+            responses.GET,
+            blueskyapi.default_config.base_url + "/forecasts/latest",
+            body=requests.ConnectionError("connection refused"),
+        )
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+
+        client.latest_forecast(53.5, 13.5)
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_does_not_retry_client_errors(client):
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5",
+            result={"detail": "Invalid API key"},
+            status=401,
+        )
+        with pytest.raises(blueskyapi.errors.InvalidApiKey):
+            client.latest_forecast(53.5, 13.5)
+        assert len(responses.calls) == 1
+
+
+def describe_with_concurrency_limiter():
+    @pytest.fixture()
+    def limiter():
+        return ConcurrencyLimiter(initial_limit=4, latency_tolerance=None)
+
+    @pytest.fixture(autouse=True)
+    def sleep(mocker):
+        return mocker.patch("time.sleep")
+
+    @responses.activate
+    def test_backs_off_on_errors(limiter):
+        events = []
+        observer = Observer()
+        observer.on_request = events.append
+        client = blueskyapi.Client(
+            rate_limiter=RateLimiter(retries=2),
+            concurrency_limiter=limiter,
+            observers=[observer],
+        )
+        responses.add(
+            responses.GET,
+            blueskyapi.default_config.base_url + "/forecasts/latest",
+            json={"the": "error"},
+            status=503,
+        )
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+
+        client.latest_forecast(53.5, 13.5)
+        assert limiter.limit == 2
+        assert [event.concurrency_limit for event in events] == [2]
+
+    @responses.activate
+    def test_releases_slot_on_connection_error():
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        client = blueskyapi.Client(concurrency_limiter=limiter)
+        responses.add(
+            responses.GET,
+            blueskyapi.default_config.base_url + "/forecasts/latest",
+            body=requests.ConnectionError("connection refused"),
+        )
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+
+        with pytest.raises(requests.ConnectionError):
+            client.latest_forecast(53.5, 13.5)
+        # Would wait forever if the failed request had kept its slot.
+        assert len(client.latest_forecast(53.5, 13.5)) == 1
+
+
+def describe_with_observers():
+    class RecordingObserver(Observer):
+        def __init__(self):
+            self.requests = []
+            self.parses = []
+
+        def on_request(self, event):
+            self.requests.append(event)
+
+        def on_parse(self, event):
+            self.parses.append(event)
+
+    @pytest.fixture()
+    def observer():
+        return RecordingObserver()
+
+    @responses.activate
+    def test_events(observer):
+        client = blueskyapi.Client(observers=[observer])
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5",
+            result=[{"forecast_moment": "2021-12-27T18:00:00Z"}] * 3,
+        )
+        client.latest_forecast(53.5, 13.5)
+
+        [request] = observer.requests
+        assert request.endpoint == "/forecasts/latest"
+        assert request.params["lat"] == 53.5
+        assert request.status_code == 200
+        assert request.response_bytes == len(responses.calls[0].response.content)
+        assert request.duration >= request.time_to_headers > 0
+        assert request.retries == 0
+        assert request.error is None
+        assert not request.cached
+
+        [parse] = observer.parses
+        assert parse.endpoint == "/forecasts/latest"
+        assert parse.rows == 3
+        assert parse.duration > 0
+
+    @responses.activate
+    def with_error(observer):
+        client = blueskyapi.Client(observers=[observer])
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5", result={"the": "error"}, status=429
+        )
+        with pytest.raises(blueskyapi.errors.OverRateLimit):
+            client.latest_forecast(53.5, 13.5)
+
+        [request] = observer.requests
+        assert request.status_code == 429
+        assert isinstance(request.error, blueskyapi.errors.OverRateLimit)
+        assert observer.parses == []
+
+    @responses.activate
+    def with_retries(observer, mocker):
+        mocker.patch("time.sleep")
+        client = blueskyapi.Client(
+            rate_limiter=RateLimiter(retries=2), observers=[observer]
+        )
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5", result={"the": "error"}, status=503
+        )
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        client.latest_forecast(53.5, 13.5)
+
+        [request] = observer.requests
+        assert request.status_code == 200
+        assert request.retries == 1
+
+    @responses.activate
+    def with_cache(observer, tmp_path):
+        client = blueskyapi.Client(
+            cache=SQLiteCache(str(tmp_path / "cache.sqlite")), observers=[observer]
+        )
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        client.latest_forecast(53.5, 13.5)
+        client.latest_forecast(53.5, 13.5)
+
+        assert [request.cached for request in observer.requests] == [False, True]
+
+    @responses.activate
+    def with_many(observer):
+        client = blueskyapi.Client(observers=[observer])
+        add_api_response("/forecasts/latest?lat=50&lon=13.5")
+        add_api_response("/forecasts/latest?lat=51&lon=13.5")
+        client.latest_forecast_many([(50, 13.5), (51, 13.5)])
+
+        assert len(observer.requests) == 2
+        [parse] = observer.parses
+        assert parse.rows == 2
+
 
 def describe_with_api_key():
     @responses.activate
@@ -76,6 +816,19 @@ def describe_latest_forecast():
         add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
         client.latest_forecast(53.5, 13.5)
 
+    @responses.activate
+    def with_raw(client):
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5",
+            result=[{"forecast_moment": "2021-12-27T18:00:00Z", "some_column": 5}],
+        )
+        result = client.latest_forecast(53.5, 13.5, raw=True)
+        assert result == [{"forecast_moment": "2021-12-27T18:00:00Z", "some_column": 5}]
+
+    def with_raw_and_format(client):
+        with pytest.raises(ValueError, match="raw results are always JSON"):
+            client.latest_forecast(53.5, 13.5, raw=True, format="arrow")
+
     def describe_forecast_distances():
         @responses.activate
         def with_array(client):
@@ -134,6 +887,22 @@ def describe_latest_forecast():
         )
         assert np.all(result.some_column == [5])
 
+    @responses.activate
+    def with_compact(client):
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5",
+            result=[
+                {
+                    "forecast_moment": "2021-12-27T18:00:00Z",
+                    "forecast_distance": 0,
+                    "some_column": 5.5,
+                }
+            ],
+        )
+        result = client.latest_forecast(53.5, 13.5, compact=True)
+        assert str(result.forecast_distance.dtype) == "int16"
+        assert str(result.some_column.dtype) == "float32"
+
     def describe_dataset():
         @responses.activate
         def with_valid(client):
@@ -163,6 +932,124 @@ def describe_latest_forecast():
         assert np.all(result.apparent_temperature_at_2m < 290)
 
 
+def describe_latest_forecast_many():
+    @responses.activate
+    def test_result(client):
+        for lat in [50, 51]:
+            add_api_response(
+                f"/forecasts/latest?lat={lat}&lon=13.5&columns=some_column",
+                result=[
+                    {"forecast_moment": "2021-12-27T18:00:00Z", "some_column": lat},
+                    {"forecast_moment": "2021-12-28T00:00:00Z", "some_column": lat},
+                ],
+            )
+
+        result = client.latest_forecast_many(
+            [(50, 13.5), (51, 13.5)], columns=["some_column"]
+        )
+
+        assert list(result.columns) == ["lat", "lon", "forecast_moment", "some_column"]
+        assert list(result.lat) == [50, 50, 51, 51]
+        assert list(result.lon) == [13.5] * 4
+        assert list(result.some_column) == [50, 50, 51, 51]
+        assert str(result.forecast_moment.dtype) == "datetime64[ns, UTC]"
+
+    @responses.activate
+    def with_array(client):
+        add_api_response("/forecasts/latest?lat=50.0&lon=13.5")
+        add_api_response("/forecasts/latest?lat=51.0&lon=13.5")
+        result = client.latest_forecast_many(np.array([[50, 13.5], [51, 13.5]]))
+        assert list(result.lat) == [50, 51]
+
+    def with_no_points(client):
+        result = client.latest_forecast_many([])
+        assert list(result.columns) == ["lat", "lon"]
+        assert len(result) == 0
+
+    def with_invalid_points(client):
+        with pytest.raises(TypeError, match="points should be"):
+            client.latest_forecast_many([1, 2])
+
+    @responses.activate
+    def test_over_rate_limit(client):
+        add_api_response("/forecasts/latest?lat=50&lon=13.5")
+        add_api_response(
+            "/forecasts/latest?lat=51&lon=13.5", result={"the": "error"}, status=429
+        )
+        with pytest.raises(blueskyapi.errors.OverRateLimit, match="429"):
+            client.latest_forecast_many([(50, 13.5), (51, 13.5)])
+
+
+def describe_prepare_latest():
+    @responses.activate
+    def test_result(client):
+        add_api_response(
+            "/forecasts/latest?lat=53.5&lon=13.5&columns=a,b&forecast_distances=0,6",
+            result=[{"forecast_moment": "2021-12-27T18:00:00Z", "a": 1.5, "b": 2}],
+        )
+        query = client.prepare_latest(columns=["a", "b"], forecast_distances=[0, 6])
+
+        result = query(53.5, 13.5)
+        expected = client.latest_forecast(
+            53.5, 13.5, columns=["a", "b"], forecast_distances=[0, 6]
+        )
+        pd.testing.assert_frame_equal(result, expected)
+        assert responses.calls[0].request.url == responses.calls[1].request.url
+
+    @responses.activate
+    def test_sends_session_headers():
+        pytest.importorskip("pyarrow")
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5", api_key="the-key")
+        client = blueskyapi.Client("the-key", timeout=5)
+        query = client.prepare_latest(format="arrow")
+        query(53.5, 13.5)
+
+        headers = responses.calls[0].request.headers
+        assert headers["User-Agent"] == client.session.headers["User-Agent"]
+        assert "application/vnd.apache.arrow.stream" in headers["Accept"]
+
+    @responses.activate
+    def test_does_not_affect_other_requests():
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5", api_key="new-key")
+        client = blueskyapi.Client("old-key")
+        client.prepare_latest()
+        client.session.headers["Authorization"] = "Bearer new-key"
+        client.latest_forecast(53.5, 13.5)
+
+    @responses.activate
+    def with_timeout(mocker):
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        client = blueskyapi.Client(timeout=5)
+        send = mocker.spy(client.session, "send")
+        client.prepare_latest()(53.5, 13.5)
+        assert send.call_args.kwargs["timeout"] == 5
+
+    @responses.activate
+    def with_raw(client):
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        assert client.prepare_latest(raw=True)(53.5, 13.5) == default_result
+
+    @responses.activate
+    def with_many(client):
+        add_api_response("/forecasts/latest?lat=50&lon=13.5&columns=a")
+        add_api_response("/forecasts/latest?lat=51&lon=13.5&columns=a")
+        result = client.prepare_latest(columns=["a"]).many([(50, 13.5), (51, 13.5)])
+        assert list(result.lat) == [50, 51]
+
+    @responses.activate
+    def with_grid_resolution():
+        add_api_response("/forecasts/latest?lat=53.5&lon=13.5")
+        blueskyapi.Client(grid_resolution=0.25).prepare_latest()(53.61, 13.39)
+
+    def with_invalid_columns(client):
+        with pytest.raises(TypeError, match="columns should be"):
+            client.prepare_latest(columns=5)
+
+    def with_raw_and_format(client):
+        with pytest.raises(ValueError, match="raw results are always JSON"):
+            client.prepare_latest(raw=True, format="arrow")
+
+
 def describe_forecast_history():
     def describe_min_forecast_moments():
         @responses.activate
@@ -225,6 +1112,208 @@ def describe_forecast_history():
                 dataset="the-dataset",
             )
 
+    def describe_chunk_size():
+        @responses.activate
+        def test_splits_range(client):
+            add_chunk_response("2021-12-27T00:00:00", "2021-12-27T11:59:59")
+            add_chunk_response("2021-12-27T12:00:00", "2021-12-27T23:59:59")
+            add_chunk_response("2021-12-28T00:00:00", "2021-12-28T00:00:00")
+
+            result = client.forecast_history(
+                53.5,
+                13.5,
+                min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                max_forecast_moment="2021-12-28T00:00:00Z",
+                chunk_size=timedelta(hours=12),
+            )
+
+            assert len(responses.calls) == 3
+            assert list(result.forecast_moment) == list(
+                pd.to_datetime(
+                    ["2021-12-27T00:00:00Z"] * 2
+                    + ["2021-12-27T12:00:00Z"] * 2
+                    + ["2021-12-28T00:00:00Z"] * 2
+                )
+            )
+            assert list(result.forecast_distance) == [0, 3] * 3
+            assert list(result.index) == list(range(6))
+
+        @responses.activate
+        def with_compact(client):
+            for start, end, kind in [
+                ("2021-12-27T00:00:00", "2021-12-27T11:59:59", "rain"),
+                ("2021-12-27T12:00:00", "2021-12-27T23:59:59", "snow"),
+            ]:
+                add_chunk_response(
+                    start,
+                    end,
+                    result=[
+                        {
+                            "forecast_moment": f"{start}Z",
+                            "forecast_distance": 0,
+                            "kind": kind,
+                        }
+                    ],
+                )
+
+            result = client.forecast_history(
+                53.5,
+                13.5,
+                min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                max_forecast_moment="2021-12-27T23:59:59Z",
+                chunk_size=timedelta(hours=12),
+                compact=True,
+            )
+
+            assert result.kind.dtype == "category"
+            assert list(result.kind) == ["rain", "snow"]
+
+        @responses.activate
+        def test_drops_duplicates(client):
+            add_chunk_response("2021-12-27T00:00:00", "2021-12-27T11:59:59")
+            add_chunk_response(
+                "2021-12-27T12:00:00",
+                "2021-12-27T12:00:00",
+                result=[
+                    {
+                        "forecast_moment": "2021-12-27T00:00:00Z",
+                        "forecast_distance": 3,
+                    },
+                    {
+                        "forecast_moment": "2021-12-27T12:00:00Z",
+                        "forecast_distance": 0,
+                    },
+                ],
+            )
+
+            result = client.forecast_history(
+                53.5,
+                13.5,
+                min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                max_forecast_moment=datetime(2021, 12, 27, 12, 0),
+                chunk_size=timedelta(hours=12),
+            )
+            assert list(result.forecast_distance) == [0, 3, 0]
+
+        @responses.activate
+        def with_empty_range(client):
+            result = client.forecast_history(
+                53.5,
+                13.5,
+                min_forecast_moment=datetime(2021, 12, 27, 12, 0),
+                max_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                chunk_size=timedelta(hours=12),
+            )
+            assert len(result) == 0
+            assert len(responses.calls) == 0
+
+        @responses.activate
+        def test_retries_failed_chunks(client, mocker):
+            sleep = mocker.patch("time.sleep")
+            add_chunk_response("2021-12-27T00:00:00", "2021-12-27T00:00:00", status=503)
+            add_chunk_response("2021-12-27T00:00:00", "2021-12-27T00:00:00")
+
+            result = client.forecast_history(
+                53.5,
+                13.5,
+                min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                max_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                chunk_size=timedelta(hours=12),
+            )
+            assert len(result) == 2
+            sleep.assert_called_once()
+            assert 0.5 <= sleep.call_args.args[0] <= 1
+
+        @responses.activate
+        def test_waits_for_retry_after(client, mocker):
+            sleep = mocker.patch("time.sleep")
+            responses.add(
+                responses.GET,
+                blueskyapi.default_config.base_url + "/forecasts/history",
+                status=429,
+                headers={"Retry-After": "7"},
+            )
+            add_chunk_response("2021-12-27T00:00:00", "2021-12-27T00:00:00")
+
+            client.forecast_history(
+                53.5,
+                13.5,
+                min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                max_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                chunk_size=timedelta(hours=12),
+            )
+            sleep.assert_called_once_with(7.0)
+
+        @responses.activate
+        def with_rate_limiter(mocker):
+            mocker.patch("time.sleep")
+            client = blueskyapi.Client(rate_limiter=RateLimiter(retries=1))
+            add_chunk_response("2021-12-27T00:00:00", "2021-12-27T00:00:00", status=503)
+
+            with pytest.raises(blueskyapi.errors.RequestError):
+                client.forecast_history(
+                    53.5,
+                    13.5,
+                    min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                    max_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                    chunk_size=timedelta(hours=12),
+                    chunk_retries=2,
+                )
+            assert len(responses.calls) == 2
+
+        @responses.activate
+        def test_gives_up_after_retries(client, mocker):
+            mocker.patch("time.sleep")
+            add_chunk_response(
+                "2021-12-27T00:00:00",
+                "2021-12-27T00:00:00",
+                result={"the": "error"},
+                status=429,
+            )
+
+            with pytest.raises(blueskyapi.errors.OverRateLimit):
+                client.forecast_history(
+                    53.5,
+                    13.5,
+                    min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                    max_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                    chunk_size=timedelta(hours=12),
+                    chunk_retries=1,
+                )
+            assert len(responses.calls) == 2
+
+        @responses.activate
+        def test_does_not_retry_client_errors(client):
+            add_chunk_response(
+                "2021-12-27T00:00:00",
+                "2021-12-27T00:00:00",
+                result={"detail": "Invalid API key"},
+                status=401,
+            )
+
+            with pytest.raises(blueskyapi.errors.InvalidApiKey):
+                client.forecast_history(
+                    53.5,
+                    13.5,
+                    min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                    max_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                    chunk_size=timedelta(hours=12),
+                )
+            assert len(responses.calls) == 1
+
+        def without_min_forecast_moment(client):
+            with pytest.raises(ValueError, match="min_forecast_moment is required"):
+                client.forecast_history(53.5, 13.5, chunk_size=timedelta(hours=12))
+
+        def with_invalid_chunk_size(client):
+            with pytest.raises(ValueError, match="chunk_size should be positive"):
+                client.forecast_history(
+                    53.5,
+                    13.5,
+                    min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+                    chunk_size=timedelta(0),
+                )
+
     @pytest.mark.vcr()
     def test_integration(client):
         min_moment = datetime(2021, 12, 27, 18, 0)
@@ -246,3 +1335,65 @@ def describe_forecast_history():
 
         assert np.all(result.apparent_temperature_at_2m > 250)
         assert np.all(result.apparent_temperature_at_2m < 290)
+
+
+def describe_iter_forecast_history():
+    @responses.activate
+    def test_yields_chunks(client):
+        add_chunk_response("2021-12-27T00:00:00", "2021-12-27T11:59:59")
+        add_chunk_response(
+            "2021-12-27T12:00:00",
+            "2021-12-27T12:00:00",
+            result=[
+                {"forecast_moment": "2021-12-27T00:00:00Z", "forecast_distance": 3},
+                {"forecast_moment": "2021-12-27T12:00:00Z", "forecast_distance": 0},
+            ],
+        )
+
+        chunks = client.iter_forecast_history(
+            53.5,
+            13.5,
+            min_forecast_moment=datetime(2021, 12, 27, 0, 0),
+            max_forecast_moment=datetime(2021, 12, 27, 12, 0),
+            chunk_size=timedelta(hours=12),
+        )
+        assert len(responses.calls) == 0
+
+        first = next(chunks)
+        assert len(responses.calls) == 1
+        assert list(first.forecast_distance) == [0, 3]
+
+        second = next(chunks)
+        assert list(second.forecast_distance) == [0]
+        assert list(second.index) == [0]
+
+        with pytest.raises(StopIteration):
+            next(chunks)
+
+    def with_invalid_value(client):
+        with pytest.raises(TypeError, match="min_forecast_moment should be"):
+            client.iter_forecast_history(53.5, 13.5, min_forecast_moment=1)
+
+
+def describe_forecast_history_many():
+    @responses.activate
+    def test_result(client):
+        for lat in [50, 51]:
+            add_api_response(
+                "/forecasts/history"
+                f"?lat={lat}&lon=13.5"
+                "&min_forecast_moment=2021-12-27T18:00:00"
+                "&max_forecast_moment=2021-12-28T00:00:00",
+                result=[
+                    {"forecast_moment": "2021-12-27T18:00:00Z", "some_column": lat}
+                ],
+            )
+
+        result = client.forecast_history_many(
+            [(50, 13.5), (51, 13.5)],
+            min_forecast_moment=datetime(2021, 12, 27, 18, 0),
+            max_forecast_moment=datetime(2021, 12, 28, 0, 0),
+        )
+
+        assert list(result.lat) == [50, 51]
+        assert list(result.some_column) == [50, 51]
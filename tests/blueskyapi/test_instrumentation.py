@@ -0,0 +1,63 @@
+from blueskyapi.instrumentation import MetricsCollector
+from blueskyapi.instrumentation import ParseEvent
+from blueskyapi.instrumentation import RequestEvent
+
+
+def describe_metrics_collector():
+    def test_counters():
+        metrics = MetricsCollector()
+        metrics.on_request(
+            RequestEvent("/a", {}, status_code=200, response_bytes=10, retries=2)
+        )
+        metrics.on_request(
+            RequestEvent("/a", {}, status_code=429, error=Exception("limit"))
+        )
+        metrics.on_request(RequestEvent("/a", {}, response_bytes=10, cached=True))
+        metrics.on_request(RequestEvent("/b", {}, status_code=200))
+        metrics.on_parse(ParseEvent("/a", rows=15, duration=0.1))
+
+        summary = metrics.summary()
+        assert summary["/a"]["requests"] == 3
+        assert summary["/a"]["retries"] == 2
+        assert summary["/a"]["bytes"] == 20
+        assert summary["/a"]["errors"] == 1
+        assert summary["/a"]["cache_hits"] == 1
+        assert summary["/a"]["status_200"] == 1
+        assert summary["/a"]["status_429"] == 1
+        assert summary["/a"]["rows"] == 15
+        assert summary["/b"]["requests"] == 1
+
+    def test_percentiles():
+        metrics = MetricsCollector()
+        for i in range(1, 101):
+            metrics.on_request(RequestEvent("/a", {}, duration=i / 100))
+
+        assert metrics.summary()["/a"]["duration"] == {
+            "p50": 0.51,
+            "p90": 0.91,
+            "p99": 1.0,
+        }
+        assert metrics.summary()["/a"]["parse"] == {}
+
+    def test_window():
+        metrics = MetricsCollector(window=2)
+        for duration in [10, 1, 1]:
+            metrics.on_request(RequestEvent("/a", {}, duration=duration))
+
+        assert metrics.summary()["/a"]["duration"]["p99"] == 1
+        assert metrics.summary()["/a"]["requests"] == 3
+
+    def test_concurrency_limit():
+        metrics = MetricsCollector()
+        metrics.on_request(RequestEvent("/a", {}))
+        assert "concurrency_limit" not in metrics.summary()["/a"]
+
+        metrics.on_request(RequestEvent("/a", {}, concurrency_limit=4))
+        metrics.on_request(RequestEvent("/a", {}, concurrency_limit=5))
+        assert metrics.summary()["/a"]["concurrency_limit"] == 5
+
+    def test_reset():
+        metrics = MetricsCollector()
+        metrics.on_request(RequestEvent("/a", {}))
+        metrics.reset()
+        assert metrics.summary() == {}
@@ -0,0 +1,243 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from blueskyapi import parsing
+
+
+columnar_records = [
+    {
+        "forecast_moment": "2021-12-27T18:00:00Z",
+        "forecast_distance": distance,
+        "temperature": 270.5 + distance,
+        "categorical_rain_at_surface": 1.0,
+        "int_column": 5,
+    }
+    for distance in [0, 3]
+]
+
+
+def encode_columnar(records, format):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    df = pd.DataFrame(records)
+    df["forecast_moment"] = pd.to_datetime(df.forecast_moment, utc=True)
+    table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    if format == "parquet":
+        pyarrow.parquet.write_table(table, sink)
+    elif format == "arrow_file":
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
+
+
+def describe_create_dataframe():
+    def test_dtypes():
+        result = parsing.create_dataframe(
+            json.dumps(
+                [
+                    {
+                        "forecast_moment": "2021-12-27T18:00:00Z",
+                        "forecast_distance": 0,
+                        "float_column": 1.5,
+                        "int_column": 1,
+                        "missing_column": None,
+                        "text_column": "a",
+                    },
+                    {
+                        "forecast_moment": "2021-12-27T18:00:00Z",
+                        "forecast_distance": 3,
+                        "float_column": 2.0,
+                        "int_column": 2,
+                        "missing_column": 3.5,
+                        "text_column": "b",
+                    },
+                ]
+            )
+        )
+
+        assert result.dtypes.astype(str).to_dict() == {
+            "forecast_moment": "datetime64[ns, UTC]",
+            "forecast_distance": "int64",
+            "float_column": "float64",
+            "int_column": "int64",
+            "missing_column": "float64",
+            "text_column": "object",
+        }
+        assert np.all(result.forecast_moment == pd.to_datetime("2021-12-27T18:00:00Z"))
+        assert list(result.forecast_distance) == [0, 3]
+        assert list(result.float_column) == [1.5, 2.0]
+        assert np.isnan(result.missing_column[0])
+        assert list(result.text_column) == ["a", "b"]
+
+    def with_bytes():
+        result = parsing.create_dataframe(
+            b'[{"forecast_moment": "2021-12-27T18:00:00Z"}]'
+        )
+        assert list(result.columns) == ["forecast_moment"]
+        assert len(result) == 1
+
+    def with_differing_keys():
+        result = parsing.create_dataframe('[{"a": 1}, {"b": 2.5}]')
+        assert list(result.columns) == ["a", "b"]
+        assert np.isnan(result.a[1])
+        assert np.isnan(result.b[0])
+
+    def with_extra_keys_in_later_records():
+        result = parsing.create_dataframe('[{"a": 1.0}, {"a": 2.0, "b": 3.0}]')
+        assert list(result.columns) == ["a", "b"]
+        assert list(result.a) == [1, 2]
+        assert np.isnan(result.b[0])
+        assert result.b[1] == 3
+
+    def with_empty_response():
+        result = parsing.create_dataframe("[]")
+        assert len(result) == 0
+
+    def test_same_values_as_read_json():
+        response = json.dumps(
+            [
+                {
+                    "forecast_moment": "2021-12-27T18:00:00Z",
+                    "forecast_distance": distance,
+                    "temperature": 270.5 + distance,
+                }
+                for distance in range(5)
+            ]
+        )
+        expected = pd.read_json(response)
+        expected.forecast_moment = pd.to_datetime(expected.forecast_moment)
+
+        pd.testing.assert_frame_equal(parsing.create_dataframe(response), expected)
+
+
+def describe_compact():
+    def test_dtypes():
+        result = parsing.create_dataframe(
+            json.dumps(
+                [
+                    {
+                        "forecast_moment": "2021-12-27T18:00:00Z",
+                        "forecast_distance": distance,
+                        "float_column": 1.5,
+                        "categorical_rain_at_surface": 1.0,
+                        "categorical_snow_at_surface": None,
+                        "small_int_column": 1,
+                        "large_int_column": 100000,
+                        "text_column": "a",
+                    }
+                    for distance in [0, 3]
+                ]
+            ),
+            compact=True,
+        )
+
+        assert result.dtypes.astype(str).to_dict() == {
+            "forecast_moment": "datetime64[ns, UTC]",
+            "forecast_distance": "int16",
+            "float_column": "float32",
+            "categorical_rain_at_surface": "int8",
+            "categorical_snow_at_surface": "float32",
+            "small_int_column": "int8",
+            "large_int_column": "int32",
+            "text_column": "category",
+        }
+        assert list(result.float_column) == [1.5, 1.5]
+        assert list(result.categorical_rain_at_surface) == [1, 1]
+        assert list(result.text_column) == ["a", "a"]
+
+    def test_uses_less_memory():
+        response = json.dumps(
+            [
+                {
+                    "forecast_moment": "2021-12-27T18:00:00Z",
+                    "forecast_distance": distance,
+                    "temperature": 270.5 + distance,
+                    "categorical_rain_at_surface": 0.0,
+                }
+                for distance in range(100)
+            ]
+        )
+        full = parsing.create_dataframe(response).memory_usage().sum()
+        compact = parsing.create_dataframe(response, compact=True).memory_usage().sum()
+        assert compact < full * 0.6
+
+    def with_points():
+        result = parsing.create_points_dataframe(
+            [(53.3, 13.5)], ['[{"forecast_distance": 0, "a": 1.5}]'], compact=True
+        )
+        assert result.lat[0] == 53.3
+        assert str(result.a.dtype) == "float32"
+
+
+def describe_columnar_responses():
+    @pytest.mark.parametrize("format", ["arrow", "arrow_file", "parquet"])
+    def test_same_result_as_json(format):
+        result = parsing.create_dataframe(encode_columnar(columnar_records, format))
+        expected = parsing.create_dataframe(json.dumps(columnar_records))
+        pd.testing.assert_frame_equal(result, expected)
+
+    def with_compact():
+        result = parsing.create_dataframe(
+            encode_columnar(columnar_records, "arrow"), compact=True
+        )
+        expected = parsing.create_dataframe(json.dumps(columnar_records), compact=True)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def with_points():
+        result = parsing.create_points_dataframe(
+            [(50, 13.5), (51, 13.5)],
+            [encode_columnar(columnar_records, "arrow"), json.dumps(columnar_records)],
+        )
+        assert list(result.columns[:2]) == ["lat", "lon"]
+        assert list(result.lat) == [50, 50, 51, 51]
+        assert list(result.temperature) == [270.5, 273.5, 270.5, 273.5]
+
+    def with_points_and_compact():
+        result = parsing.create_points_dataframe(
+            [(50, 13.5), (51, 13.5)],
+            [
+                encode_columnar(
+                    [dict(r, kind="rain") for r in columnar_records], "arrow"
+                ),
+                encode_columnar(
+                    [dict(r, kind="snow") for r in columnar_records], "arrow"
+                ),
+            ],
+            compact=True,
+        )
+        assert result.kind.dtype == "category"
+        assert list(result.kind) == ["rain", "rain", "snow", "snow"]
+
+
+def describe_create_points_dataframe():
+    def test_result():
+        result = parsing.create_points_dataframe(
+            [(50, 13.5), (51, 13.5)],
+            ['[{"a": 1}, {"a": 2}]', '[{"a": 3}]'],
+        )
+        assert list(result.columns) == ["lat", "lon", "a"]
+        assert list(result.lat) == [50, 50, 51]
+        assert list(result.a) == [1, 2, 3]
+
+    def with_differing_columns():
+        result = parsing.create_points_dataframe(
+            [(50, 13.5), (51, 13.5)],
+            ['[{"a": 1.0}]', '[{"a": 2.0, "b": 3.0}]'],
+        )
+        assert list(result.columns) == ["lat", "lon", "a", "b"]
+        assert np.isnan(result.b[0])
+        assert result.b[1] == 3
+
+    def with_empty_responses():
+        result = parsing.create_points_dataframe([(50, 13.5)], ["[]"])
+        assert list(result.columns) == ["lat", "lon"]
+        assert len(result) == 0
@@ -0,0 +1,118 @@
+import json
+
+import pandas as pd
+import pytest
+import responses
+
+import blueskyapi
+from blueskyapi import parsing
+from blueskyapi import processes
+from blueskyapi.processes import ProcessParser
+
+
+records = [
+    {
+        "forecast_moment": "2021-12-27T18:00:00Z",
+        "forecast_distance": distance,
+        "temperature": 270.5 + distance,
+        "categorical_rain_at_surface": 1.0,
+        "flag": distance > 0,
+        "text_column": "a",
+    }
+    for distance in range(10)
+]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    with ProcessParser(max_workers=2, min_bytes=0, batch_size=2) as parser:
+        yield parser
+
+
+def describe_create_dataframe():
+    def test_same_result(parser):
+        response = json.dumps(records)
+        pd.testing.assert_frame_equal(
+            parser.create_dataframe(response), parsing.create_dataframe(response)
+        )
+
+    def with_compact(parser):
+        response = json.dumps(records).encode()
+        pd.testing.assert_frame_equal(
+            parser.create_dataframe(response, compact=True),
+            parsing.create_dataframe(response, compact=True),
+        )
+
+    def with_empty_response(parser):
+        assert len(parser.create_dataframe("[]")) == 0
+
+    def with_small_response(mocker):
+        parser = ProcessParser(max_workers=1)
+        submit = mocker.spy(parser._executor, "submit")
+        parser.create_dataframe(json.dumps(records))
+        submit.assert_not_called()
+        parser.close()
+
+    def without_shared_memory(parser, mocker):
+        # As on Python 3.7, where workers return pickled DataFrames.
+        mocker.patch.object(processes, "shared_memory", None)
+        result = processes._parse(None, [json.dumps(records)], False)
+        assert isinstance(result, pd.DataFrame)
+        assert parser._result(_Done(result)) is result
+
+
+class _Done:
+    def __init__(self, result):
+        self._value = result
+
+    def result(self):
+        return self._value
+
+
+def describe_create_points_dataframe():
+    def test_same_result(parser):
+        points = [(50, 13.5), (51, 13.5), (52, 13.5)]
+        responses = [json.dumps(records), json.dumps(records[:3]), "[]"]
+        pd.testing.assert_frame_equal(
+            parser.create_points_dataframe(points, responses),
+            parsing.create_points_dataframe(points, responses),
+        )
+
+    def test_splits_across_workers(parser, monkeypatch, mocker):
+        monkeypatch.setattr(parser, "batch_size", 16)
+        submit = mocker.spy(parser._executor, "submit")
+        points = [(50 + i, 13.5) for i in range(5)]
+        parser.create_points_dataframe(points, [json.dumps(records)] * 5)
+        assert [len(call.args[1]) for call in submit.call_args_list] == [3, 2]
+
+    def test_caps_batches(parser, mocker):
+        submit = mocker.spy(parser._executor, "submit")
+        points = [(50 + i, 13.5) for i in range(5)]
+        parser.create_points_dataframe(points, [json.dumps(records)] * 5)
+        assert [len(call.args[1]) for call in submit.call_args_list] == [2, 2, 1]
+
+    def with_invalid_response(parser):
+        with pytest.raises(json.JSONDecodeError):
+            parser.create_points_dataframe(
+                [(50, 13.5), (51, 13.5), (52, 13.5)],
+                [json.dumps(records), "not json", json.dumps(records)],
+            )
+
+
+def describe_client():
+    @responses.activate
+    def test_parses_in_workers(parser, mocker):
+        for lat in [50, 51]:
+            responses.add(
+                responses.GET,
+                f"{blueskyapi.default_config.base_url}/forecasts/history"
+                f"?lat={lat}&lon=13.5",
+                json=records,
+            )
+        client = blueskyapi.Client(process_parser=parser)
+        submit = mocker.spy(parser._executor, "submit")
+
+        result = client.forecast_history_many([(50, 13.5), (51, 13.5)])
+
+        assert submit.call_count == 2
+        assert list(result.lat) == [50] * 10 + [51] * 10
@@ -0,0 +1,253 @@
+import threading
+from datetime import timedelta
+
+import pytest
+import requests
+from doubles import InstanceDouble
+
+from blueskyapi.ratelimit import ConcurrencyLimiter
+from blueskyapi.ratelimit import RateLimiter
+
+
+def response(status_code=200, headers={}):
+    return InstanceDouble(
+        "requests.Response",
+        status_code=status_code,
+        headers=requests.structures.CaseInsensitiveDict(headers),
+    )
+
+
+def timed_response(status_code=200, seconds=0.1, path="/forecasts/latest"):
+    return InstanceDouble(
+        "requests.Response",
+        status_code=status_code,
+        elapsed=timedelta(seconds=seconds),
+        url=f"https://api.blueskyapi.io{path}?lat=53.5&lon=13.5",
+    )
+
+
+def run_saturated(limiter, response, times):
+    for _ in range(times):
+        slots = [limiter.acquire() for _ in range(limiter.limit)]
+        for slot in slots:
+            limiter.release(slot, response)
+
+
+def release_timed(limiter, seconds):
+    for value in seconds:
+        limiter.release(limiter.acquire(), timed_response(seconds=value))
+
+
+@pytest.fixture()
+def clock(mocker):
+    now = [2_000_000_000.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    mocker.patch("time.monotonic", side_effect=lambda: now[0])
+    mocker.patch("time.time", side_effect=lambda: now[0])
+    return mocker.patch("time.sleep", side_effect=sleep)
+
+
+def describe_init():
+    def with_invalid_rate():
+        with pytest.raises(ValueError, match="requests_per_second should be"):
+            RateLimiter(requests_per_second=0)
+
+
+def describe_acquire():
+    def without_rate(clock):
+        limiter = RateLimiter()
+        for _ in range(3):
+            limiter.acquire()
+        clock.assert_not_called()
+
+    def with_rate(clock):
+        limiter = RateLimiter(requests_per_second=2)
+        for _ in range(3):
+            limiter.acquire()
+        assert [call.args[0] for call in clock.call_args_list] == [0.5, 0.5]
+
+    def with_burst(clock):
+        limiter = RateLimiter(requests_per_second=2, burst=2)
+        for _ in range(4):
+            limiter.acquire()
+        assert [call.args[0] for call in clock.call_args_list] == [0.5, 0.5]
+
+    def when_paused(clock):
+        limiter = RateLimiter()
+        limiter.pause(10)
+        limiter.acquire()
+        clock.assert_called_once_with(10)
+
+
+def describe_update():
+    def with_remaining_quota(clock):
+        limiter = RateLimiter(requests_per_second=100)
+        limiter.update(
+            response(headers={"X-RateLimit-Remaining": "30", "X-RateLimit-Reset": "60"})
+        )
+        assert limiter.rate == 0.5
+
+    def with_configured_rate_below_quota():
+        limiter = RateLimiter(requests_per_second=0.1)
+        limiter.update(
+            response(headers={"RateLimit-Remaining": "30", "RateLimit-Reset": "60"})
+        )
+        assert limiter.rate == 0.1
+
+    def with_exhausted_quota(clock):
+        limiter = RateLimiter()
+        limiter.update(
+            response(headers={"RateLimit-Remaining": "0", "RateLimit-Reset": "60"})
+        )
+        limiter.acquire()
+        clock.assert_called_once_with(60)
+
+    def with_reset_timestamp(clock):
+        limiter = RateLimiter()
+        limiter.update(
+            response(
+                headers={"RateLimit-Remaining": "0", "RateLimit-Reset": "2000000060"}
+            )
+        )
+        limiter.acquire()
+        clock.assert_called_once_with(60)
+
+    def without_headers():
+        limiter = RateLimiter()
+        limiter.update(response())
+        assert limiter.rate is None
+
+
+def describe_retry_delay():
+    def with_retry_after(clock):
+        limiter = RateLimiter()
+        delay = limiter.retry_delay(0, response(429, {"Retry-After": "7"}))
+        assert delay == 7
+
+        limiter.acquire()
+        clock.assert_called_once_with(7)
+
+    def with_backoff(mocker):
+        mocker.patch("random.uniform", side_effect=lambda low, high: high)
+        limiter = RateLimiter(backoff=1, max_backoff=5)
+        assert [
+            limiter.retry_delay(attempt, response(503)) for attempt in range(3)
+        ] == [
+            1,
+            2,
+            4,
+        ]
+        assert RateLimiter(retries=5, max_backoff=5).retry_delay(4, response(503)) == 5
+
+    def with_jitter():
+        limiter = RateLimiter(backoff=4)
+        assert 2 <= limiter.retry_delay(0, response(500)) <= 4
+
+    def with_connection_error():
+        assert RateLimiter().retry_delay(0, None) is not None
+
+    def with_client_error():
+        assert RateLimiter().retry_delay(0, response(401)) is None
+
+    def when_out_of_retries():
+        assert RateLimiter(retries=2).retry_delay(2, response(429)) is None
+
+
+def describe_concurrency_limiter():
+    def with_invalid_limits():
+        with pytest.raises(ValueError, match="min_limit <= initial_limit"):
+            ConcurrencyLimiter(initial_limit=8, max_limit=4)
+        with pytest.raises(ValueError, match="backoff should be"):
+            ConcurrencyLimiter(backoff=1)
+
+    def test_increases_additively():
+        limiter = ConcurrencyLimiter(initial_limit=2)
+        run_saturated(limiter, timed_response(), 1)
+        assert limiter.limit == 3
+        run_saturated(limiter, timed_response(), 1)
+        assert limiter.limit == 4
+
+    def test_stays_below_max_limit():
+        limiter = ConcurrencyLimiter(initial_limit=2, max_limit=3)
+        run_saturated(limiter, timed_response(), 5)
+        assert limiter.limit == 3
+
+    def test_does_not_increase_when_not_saturated():
+        limiter = ConcurrencyLimiter(initial_limit=4)
+        for _ in range(10):
+            limiter.release(limiter.acquire(), timed_response())
+        assert limiter.limit == 4
+
+    @pytest.mark.parametrize("status_code", [429, 503])
+    def test_decreases_on_errors(status_code):
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        limiter.release(limiter.acquire(), timed_response(status_code))
+        assert limiter.limit == 4
+
+    def test_decreases_on_connection_errors():
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        limiter.release(limiter.acquire(), None)
+        assert limiter.limit == 4
+
+    def test_decreases_once_per_round():
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        run_saturated(limiter, timed_response(429), 1)
+        assert limiter.limit == 4
+
+        limiter.release(limiter.acquire(), None)
+        assert limiter.limit == 2
+
+    def test_stays_above_min_limit():
+        limiter = ConcurrencyLimiter(initial_limit=4, min_limit=3)
+        limiter.release(limiter.acquire(), None)
+        assert limiter.limit == 3
+
+    def test_decreases_on_rising_latency():
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        release_timed(limiter, [0.1] * 5 + [0.15, 0.3, 0.3])
+        assert limiter.limit == 8
+        release_timed(limiter, [0.3])
+        assert limiter.limit == 4
+
+    def test_ignores_a_fast_outlier():
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        release_timed(limiter, [0.1] * 20 + [0.01] + [0.1] * 20)
+        assert limiter.limit == 8
+
+    def test_ignores_a_slow_outlier():
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        release_timed(limiter, [0.1] * 20 + [1, 1] + [0.1] * 20)
+        assert limiter.limit == 8
+
+    def test_compares_latency_per_endpoint():
+        limiter = ConcurrencyLimiter(initial_limit=8)
+        release_timed(limiter, [0.1] * 5)
+        for _ in range(5):
+            limiter.release(
+                limiter.acquire(), timed_response(seconds=1, path="/forecasts/history")
+            )
+        assert limiter.limit == 8
+
+    def without_latency_tolerance():
+        limiter = ConcurrencyLimiter(initial_limit=8, latency_tolerance=None)
+        release_timed(limiter, [0.1] * 5 + [10] * 5)
+        assert limiter.limit == 8
+
+    def test_waits_for_free_slot():
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        slot = limiter.acquire()
+        acquired = threading.Event()
+
+        def acquire():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        assert not acquired.wait(0.05)
+        limiter.release(slot, timed_response())
+        assert acquired.wait(1)
+        thread.join()
@@ -0,0 +1,128 @@
+import gzip
+
+import pandas as pd
+import pytest
+
+import blueskyapi
+from blueskyapi import errors
+from blueskyapi.instrumentation import MetricsCollector
+from blueskyapi.ratelimit import RateLimiter
+from blueskyapi.replay import Exchange
+from blueskyapi.replay import Recording
+from blueskyapi.replay import ReplayServer
+
+
+def record(server, **kwargs):
+    recording = Recording()
+    client = blueskyapi.Client(base_url=server.url, observers=[recording])
+    df = client.latest_forecast(53.5, 13.5, **kwargs)
+    return recording, df
+
+
+def describe_recording():
+    def test_records_responses(stand_in_server):
+        recording, _ = record(stand_in_server)
+        assert len(recording) == 1
+
+    def test_save_and_load(stand_in_server, tmp_path):
+        recording, _ = record(stand_in_server)
+        path = str(tmp_path / "recording.zip")
+        recording.save(path)
+
+        loaded = Recording.load(path)
+        assert loaded._exchanges == recording._exchanges
+
+    def test_skips_cached_and_not_modified_responses(mocker):
+        recording = Recording()
+        response = mocker.Mock(status_code=304)
+        recording.on_request(
+            blueskyapi.instrumentation.RequestEvent(
+                "/forecasts/latest", {}, cached=True
+            )
+        )
+        recording.on_request(
+            blueskyapi.instrumentation.RequestEvent(
+                "/forecasts/latest", {}, response=response
+            )
+        )
+        assert len(recording) == 0
+
+
+def describe_replay_server():
+    def test_replays_responses(stand_in_server):
+        recording, expected = record(stand_in_server, columns=["a", "b"])
+        with ReplayServer(recording) as server:
+            client = blueskyapi.Client(base_url=server.url)
+            pd.testing.assert_frame_equal(
+                client.latest_forecast(53.5, 13.5, columns=["a", "b"]), expected
+            )
+
+    def test_replays_formats(stand_in_server):
+        pytest.importorskip("pyarrow")
+        recording, expected = record(stand_in_server, format="arrow")
+        with ReplayServer(recording) as server:
+            client = blueskyapi.Client(base_url=server.url)
+            pd.testing.assert_frame_equal(
+                client.latest_forecast(53.5, 13.5, format="arrow"), expected
+            )
+            with pytest.raises(errors.RequestError) as e:
+                client.latest_forecast(53.5, 13.5)
+            assert e.value.response.status_code == 404
+
+    def test_revalidates_responses():
+        recording = Recording()
+        recording.add(
+            ("/forecasts/latest", (("lat", "53.5"), ("lon", "13.5")), "*/*"),
+            Exchange(200, {"ETag": '"v1"'}, b"[]"),
+        )
+        metrics = MetricsCollector()
+        with ReplayServer(recording) as server:
+            client = blueskyapi.Client(base_url=server.url, observers=[metrics])
+            client.latest_forecast(53.5, 13.5)
+            client.latest_forecast(53.5, 13.5)
+        assert metrics.summary()["/forecasts/latest"]["status_304"] == 1
+
+    def test_compresses_each_exchange_once(mocker):
+        exchange = Exchange(200, {}, b'[{"forecast_moment": "2021-12-27T18:00:00Z"}]')
+        recording = Recording()
+        recording.add(
+            ("/forecasts/latest", (("lat", "53.5"), ("lon", "13.5")), "*/*"), exchange
+        )
+        compress = mocker.spy(gzip, "compress")
+        with ReplayServer(recording) as server:
+            client = blueskyapi.Client(base_url=server.url)
+            client.latest_forecast(53.5, 13.5)
+            client.latest_forecast(53.5, 13.5)
+        assert compress.call_count == 1
+        assert gzip.decompress(exchange.gzipped()) == exchange.body
+
+    def test_injects_failures(stand_in_server):
+        recording, _ = record(stand_in_server)
+        metrics = MetricsCollector()
+        with ReplayServer(
+            recording, too_many_requests=0.3, errors=0.3, retry_after=0, seed=1
+        ) as server:
+            client = blueskyapi.Client(
+                base_url=server.url,
+                observers=[metrics],
+                rate_limiter=RateLimiter(retries=20, backoff=0.001),
+                cache=None,
+            )
+            for _ in range(10):
+                client.latest_forecast(53.5, 13.5)
+
+        summary = metrics.summary()["/forecasts/latest"]
+        assert summary["status_200"] == 10
+        assert summary["retries"] > 0
+
+    def test_adds_latency(stand_in_server):
+        recording, _ = record(stand_in_server)
+        metrics = MetricsCollector()
+        with ReplayServer(recording, latency=0.05) as server:
+            client = blueskyapi.Client(base_url=server.url, observers=[metrics])
+            client.latest_forecast(53.5, 13.5)
+        assert metrics.summary()["/forecasts/latest"]["duration"]["p50"] >= 0.05
+
+    def with_invalid_failure_shares():
+        with pytest.raises(ValueError):
+            ReplayServer(Recording(), too_many_requests=0.6, errors=0.6)
@@ -0,0 +1,321 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+import responses
+
+import blueskyapi
+from blueskyapi.sync import ArrayStore
+from blueskyapi.sync import ParquetStore
+from blueskyapi.sync import sync_forecast_history
+
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return ParquetStore(str(tmp_path / "store"))
+
+
+@pytest.fixture()
+def array_store(tmp_path):
+    return ArrayStore(str(tmp_path / "arrays"))
+
+
+def forecasts(*moments):
+    return pd.DataFrame(
+        {
+            "forecast_moment": pd.to_datetime(list(moments)),
+            "forecast_distance": [0] * len(moments),
+            "some_column": [1.5] * len(moments),
+        }
+    )
+
+
+def add_history_response(min_moment, moments):
+    responses.add(
+        responses.GET,
+        blueskyapi.default_config.base_url
+        + f"/forecasts/history?lat=53.5&lon=13.5&min_forecast_moment={min_moment}"
+        + "&max_forecast_moment=2021-12-27T23:59:59%2B00:00",
+        json=[
+            {"forecast_moment": moment, "forecast_distance": 0, "some_column": 1.5}
+            for moment in moments
+        ],
+    )
+
+
+def describe_parquet_store():
+    def test_partition_path(store):
+        path = store.partition_path(53.5, 13, columns=["a", "b"])
+        assert "dataset=default" in path
+        assert path.endswith("lat=53.5/lon=13.0")
+        assert path != store.partition_path(53.5, 13, columns=["a"])
+        assert path != store.partition_path(53.5, 13, "other", columns=["a", "b"])
+        assert path == store.partition_path(53.5, 13.0, columns="a,b")
+
+    def test_append_and_read(store):
+        store.append(forecasts("2021-12-27T00:00:00Z"), 53.5, 13.5)
+        store.append(forecasts("2021-12-27T06:00:00Z"), 53.5, 13.5)
+
+        result = store.read(53.5, 13.5)
+        assert list(result.forecast_moment) == list(
+            pd.to_datetime(["2021-12-27T00:00:00Z", "2021-12-27T06:00:00Z"])
+        )
+        assert store.read(52.5, 13.5).empty
+
+    def test_keeps_categories(store):
+        for moment, kind in [
+            ("2021-12-27T00:00:00Z", "rain"),
+            ("2021-12-27T06:00:00Z", "snow"),
+        ]:
+            df = forecasts(moment).assign(kind=pd.Categorical([kind]))
+            store.append(df, 53.5, 13.5)
+
+        result = store.read(53.5, 13.5)
+        assert result.kind.dtype == "category"
+        assert list(result.kind) == ["rain", "snow"]
+
+    def test_latest_forecast_moment(store):
+        assert store.latest_forecast_moment(53.5, 13.5) is None
+        store.append(
+            forecasts("2021-12-27T00:00:00Z", "2021-12-27T06:00:00Z"), 53.5, 13.5
+        )
+        assert store.latest_forecast_moment(53.5, 13.5) == pd.Timestamp(
+            "2021-12-27T06:00:00Z"
+        )
+
+    def test_ignores_temporary_files(store):
+        store.append(forecasts("2021-12-27T00:00:00Z"), 53.5, 13.5)
+        directory = store.partition_path(53.5, 13.5)
+        open(f"{directory}/.tmp-unfinished.parquet", "w").close()
+        assert len(store.read(53.5, 13.5)) == 1
+
+
+def history(*moments):
+    return pd.DataFrame(
+        {
+            "forecast_moment": pd.to_datetime(
+                [moment for moment in moments for _ in range(3)]
+            ),
+            "forecast_distance": [0, 6, 12] * len(moments),
+            "temperature": np.arange(3 * len(moments), dtype=np.float64),
+            "categorical_rain": [1.0, 0.0, 1.0] * len(moments),
+            "rain": pd.Categorical(["yes", "no", "yes"] * len(moments)),
+        }
+    )
+
+
+def describe_array_store():
+    def test_append_and_read(array_store):
+        df = history("2021-12-27T00:00:00Z", "2021-12-27T06:00:00Z")
+        array_store.append(df.iloc[3:], 53.5, 13.5)
+        array_store.append(df.iloc[:3], 53.5, 13.5)
+
+        pd.testing.assert_frame_equal(array_store.read(53.5, 13.5), df)
+        assert array_store.read(52.5, 13.5).empty
+
+    def test_sorts_rows(array_store):
+        df = history("2021-12-27T00:00:00Z", "2021-12-27T06:00:00Z")
+        array_store.append(df.iloc[::-1], 53.5, 13.5)
+        pd.testing.assert_frame_equal(array_store.read(53.5, 13.5), df)
+
+    def test_keeps_categories(array_store):
+        array_store.append(history("2021-12-27T00:00:00Z"), 53.5, 13.5)
+        df = history("2021-12-27T06:00:00Z")
+        df["rain"] = pd.Categorical(["maybe"] * 3)
+        array_store.append(df, 53.5, 13.5)
+
+        result = array_store.read(53.5, 13.5)
+        assert result.rain.dtype == "category"
+        assert list(result.rain) == ["yes", "no", "yes"] + ["maybe"] * 3
+
+    def test_reads_time_range(array_store):
+        array_store.append(history("2021-12-27T00:00:00Z"), 53.5, 13.5)
+        array_store.append(
+            history("2021-12-27T06:00:00Z", "2021-12-27T12:00:00Z"), 53.5, 13.5
+        )
+        result = array_store.read(
+            53.5,
+            13.5,
+            min_forecast_moment="2021-12-27T06:00:00Z",
+            max_forecast_moment=datetime(2021, 12, 27, 6),
+        )
+        assert set(result.forecast_moment) == {pd.Timestamp("2021-12-27T06:00:00Z")}
+        assert list(result.forecast_distance) == [0, 6, 12]
+
+    def test_latest_forecast_moment(array_store):
+        assert array_store.latest_forecast_moment(53.5, 13.5) is None
+        array_store.append(
+            history("2021-12-27T00:00:00Z", "2021-12-27T06:00:00Z"), 53.5, 13.5
+        )
+        assert array_store.latest_forecast_moment(53.5, 13.5) == pd.Timestamp(
+            "2021-12-27T06:00:00Z"
+        )
+
+    def test_ignores_temporary_directories(array_store):
+        array_store.append(history("2021-12-27T00:00:00Z"), 53.5, 13.5)
+        os.makedirs(f"{array_store.partition_path(53.5, 13.5)}/.tmp-unfinished")
+        assert len(array_store.read(53.5, 13.5)) == 3
+
+    def with_unsupported_column(array_store):
+        df = history("2021-12-27T00:00:00Z").assign(text="a")
+        with pytest.raises(TypeError, match="text"):
+            array_store.append(df, 53.5, 13.5)
+
+    def describe_forecast_history():
+        def test_selects_rows_and_columns(array_store):
+            array_store.append(
+                history("2021-12-27T00:00:00Z", "2021-12-27T06:00:00Z"), 53.5, 13.5
+            )
+            result = array_store.forecast_history(
+                53.5,
+                13.5,
+                min_forecast_moment="2021-12-27T06:00:00Z",
+                forecast_distances=[0, 12],
+                columns=["temperature"],
+            )
+            assert list(result.columns) == [
+                "forecast_moment",
+                "forecast_distance",
+                "temperature",
+            ]
+            assert list(result.forecast_distance) == [0, 12]
+            assert list(result.temperature) == [3.0, 5.0]
+
+        def test_prefers_exact_selection(array_store):
+            df = history("2021-12-27T00:00:00Z")
+            array_store.append(df, 53.5, 13.5)
+            array_store.append(
+                df[["forecast_moment", "forecast_distance", "temperature"]].assign(
+                    temperature=-1.0
+                ),
+                53.5,
+                13.5,
+                columns=["temperature"],
+            )
+            result = array_store.forecast_history(53.5, 13.5, columns="temperature")
+            assert list(result.temperature) == [-1.0] * 3
+
+        def with_missing_column(array_store):
+            array_store.append(history("2021-12-27T00:00:00Z"), 53.5, 13.5)
+            with pytest.raises(KeyError, match="wind"):
+                array_store.forecast_history(53.5, 13.5, columns=["wind"])
+
+        def with_nothing_stored(array_store):
+            assert array_store.forecast_history(53.5, 13.5).empty
+
+        def with_compact(array_store):
+            array_store.append(history("2021-12-27T00:00:00Z"), 53.5, 13.5)
+            result = array_store.forecast_history(53.5, 13.5, compact=True)
+            assert result.forecast_distance.dtype == np.int16
+            assert result.temperature.dtype == np.float32
+            assert result.categorical_rain.dtype == np.int8
+            assert result.rain.dtype == "category"
+
+
+def describe_sync_forecast_history():
+    @pytest.fixture(autouse=True)
+    def settled_before(mocker):
+        return mocker.patch(
+            "blueskyapi.sync._history_settled_before",
+            return_value=pd.Timestamp("2021-12-28T00:00:00Z"),
+        )
+
+    @responses.activate
+    def with_empty_store(store):
+        add_history_response(
+            "2021-12-27T00:00:00%2B00:00",
+            ["2021-12-27T00:00:00Z", "2021-12-27T06:00:00Z"],
+        )
+
+        added = sync_forecast_history(
+            blueskyapi.Client(),
+            store,
+            53.5,
+            13.5,
+            min_forecast_moment=datetime(2021, 12, 27),
+        )
+
+        assert added == 2
+        assert len(store.read(53.5, 13.5)) == 2
+
+    @responses.activate
+    def with_stored_forecasts(store):
+        store.append(forecasts("2021-12-27T00:00:00Z"), 53.5, 13.5)
+        add_history_response(
+            "2021-12-27T00:00:01%2B00:00",
+            ["2021-12-27T06:00:00Z", "2021-12-27T12:00:00Z"],
+        )
+
+        added = sync_forecast_history(
+            blueskyapi.Client(),
+            store,
+            53.5,
+            13.5,
+            min_forecast_moment=datetime(2021, 12, 27),
+        )
+
+        assert added == 2
+        assert list(store.read(53.5, 13.5).forecast_moment) == list(
+            pd.to_datetime(
+                [
+                    "2021-12-27T00:00:00Z",
+                    "2021-12-27T06:00:00Z",
+                    "2021-12-27T12:00:00Z",
+                ]
+            )
+        )
+
+    @responses.activate
+    def when_up_to_date(store):
+        store.append(forecasts("2021-12-27T00:00:00Z"), 53.5, 13.5)
+        add_history_response("2021-12-27T00:00:01%2B00:00", [])
+
+        added = sync_forecast_history(
+            blueskyapi.Client(),
+            store,
+            53.5,
+            13.5,
+            min_forecast_moment=datetime(2021, 12, 27),
+        )
+
+        assert added == 0
+        assert len(store.read(53.5, 13.5)) == 1
+
+    @responses.activate
+    def with_array_store(array_store):
+        array_store.append(forecasts("2021-12-27T00:00:00Z"), 53.5, 13.5)
+        add_history_response(
+            "2021-12-27T00:00:01%2B00:00",
+            ["2021-12-27T06:00:00Z", "2021-12-27T12:00:00Z"],
+        )
+
+        added = sync_forecast_history(
+            blueskyapi.Client(),
+            array_store,
+            53.5,
+            13.5,
+            min_forecast_moment=datetime(2021, 12, 27),
+        )
+
+        assert added == 2
+        assert len(array_store.forecast_history(53.5, 13.5)) == 3
+
+    @responses.activate
+    def when_nothing_settled_yet(store):
+        store.append(forecasts("2021-12-27T23:59:59Z"), 53.5, 13.5)
+
+        added = sync_forecast_history(
+            blueskyapi.Client(),
+            store,
+            53.5,
+            13.5,
+            min_forecast_moment=datetime(2021, 12, 27),
+        )
+
+        assert added == 0
+        assert len(responses.calls) == 0
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+from blueskyapi import transforms
+
+
+def forecasts(lat=None, lon=None):
+    df = pd.DataFrame(
+        {
+            "forecast_moment": pd.to_datetime(
+                ["2021-12-27T18:00:00Z"] * 3 + ["2021-12-28T00:00:00Z"] * 3
+            ),
+            "forecast_distance": [0, 6, 12] * 2,
+            "temperature": [270.0, 271.0, 272.0, 273.0, 274.0, 275.0],
+        }
+    )
+    if lat is not None:
+        df.insert(0, "lon", lon)
+        df.insert(0, "lat", lat)
+    return df
+
+
+def describe_add_valid_time():
+    def test_adds_column_after_forecast_distance():
+        df = transforms.add_valid_time(forecasts())
+        assert list(df.columns) == [
+            "forecast_moment",
+            "forecast_distance",
+            "valid_time",
+            "temperature",
+        ]
+        assert list(df.valid_time) == list(
+            pd.to_datetime(
+                [
+                    "2021-12-27T18:00:00Z",
+                    "2021-12-28T00:00:00Z",
+                    "2021-12-28T06:00:00Z",
+                    "2021-12-28T00:00:00Z",
+                    "2021-12-28T06:00:00Z",
+                    "2021-12-28T12:00:00Z",
+                ]
+            )
+        )
+
+    def test_leaves_input_unchanged():
+        df = forecasts()
+        transforms.add_valid_time(df)
+        assert "valid_time" not in df
+
+    def with_compact_distances():
+        df = forecasts().astype({"forecast_distance": "int16"})
+        assert transforms.valid_time(df)[2] == pd.Timestamp("2021-12-28T06:00:00Z")
+
+
+def describe_latest_per_valid_time():
+    def test_keeps_latest_forecast_moment():
+        df = transforms.latest_per_valid_time(forecasts())
+        assert list(df.temperature) == [270.0, 273.0, 274.0, 275.0]
+        assert df.valid_time.is_monotonic_increasing
+
+    def with_several_locations():
+        df = pd.concat(
+            [forecasts(50.0, 13.5), forecasts(51.0, 13.5).iloc[:2]],
+            ignore_index=True,
+        )
+        df = transforms.latest_per_valid_time(df)
+        assert list(df.lat) == [50.0] * 4 + [51.0] * 2
+        assert list(df.temperature) == [270.0, 273.0, 274.0, 275.0, 270.0, 271.0]
+
+    def with_empty_dataframe():
+        df = transforms.latest_per_valid_time(forecasts().iloc[:0])
+        assert len(df) == 0
+        assert "valid_time" in df
+
+
+def describe_pivot():
+    def test_valid_time_by_forecast_distance():
+        df = transforms.pivot(transforms.add_valid_time(forecasts()), "temperature")
+        assert list(df.columns) == [0, 6, 12]
+        assert len(df) == 4
+        np.testing.assert_array_equal(
+            df.to_numpy(),
+            [
+                [270.0, np.nan, np.nan],
+                [273.0, 271.0, np.nan],
+                [np.nan, 274.0, 272.0],
+                [np.nan, np.nan, 275.0],
+            ],
+        )
+
+    def test_point_by_valid_time():
+        df = transforms.latest_per_valid_time(
+            pd.concat([forecasts(51.0, 13.5), forecasts(50.0, 13.5)], ignore_index=True)
+        )
+        table = transforms.pivot(
+            df, "temperature", index=["lat", "lon"], columns="valid_time"
+        )
+        assert list(table.index) == [(50.0, 13.5), (51.0, 13.5)]
+        assert table.index.names == ["lat", "lon"]
+        np.testing.assert_array_equal(
+            table.to_numpy(), [[270.0, 273.0, 274.0, 275.0]] * 2
+        )
+
+    def with_integer_values():
+        df = transforms.add_valid_time(forecasts())
+        table = transforms.pivot(df, "forecast_distance")
+        assert table.to_numpy().dtype == np.float64
+        assert np.isnan(table.iloc[0, 1])
+
+    def with_non_numeric_values():
+        df = transforms.add_valid_time(forecasts()).assign(text="a")
+        table = transforms.pivot(df, "text")
+        assert table.iloc[0, 0] == "a"
+        assert pd.isna(table.iloc[0, 1])
@@ -2,6 +2,11 @@ import os
 
 import pytest
 
+from blueskyapi.client import _media_types
+from blueskyapi.replay import Exchange
+from blueskyapi.replay import Recording
+from blueskyapi.replay import ReplayServer
+
 
 pytest_plugins = []
 
@@ -9,3 +14,32 @@ pytest_plugins = []
 @pytest.fixture(scope="module")
 def vcr_cassette_dir(request):
     return os.path.join("tests", "cassettes", request.module.__name__)
+
+
+class StandInServer(ReplayServer):
+    """A local API answering every request with ``records``.
+
+    Encodes them as Arrow IPC or Parquet when the request accepts one
+    of ``formats``, as JSON otherwise.
+    """
+
+    def __init__(self):
+        super().__init__(Recording())
+        self.records = [
+            {"forecast_moment": "2021-12-27T18:00:00Z", "forecast_distance": 0},
+            {"forecast_moment": "2021-12-27T18:00:00Z", "forecast_distance": 6},
+        ]
+        self.formats = ["arrow", "parquet"]
+        self.requests = []
+
+    def respond(self, endpoint, params, headers):
+        self.requests.append(dict(headers))
+        accept = headers.get("Accept", "")
+        format = next((f for f in self.formats if _media_types[f] in accept), "json")
+        return Exchange.from_records(self.records, format)
+
+
+@pytest.fixture
+def stand_in_server():
+    with StandInServer() as server:
+        yield server